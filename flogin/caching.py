@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Generic, Hashable, Literal, TypeVar
+
+T = TypeVar("T")
+EvictionPolicy = Literal["lru", "lfu"]
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ("AsyncCache", "CacheStats")
+
+
+class CacheStats:
+    r"""A snapshot of the statistics of an :class:`~flogin.caching.AsyncCache`.
+
+    .. NOTE::
+        This is not intended to be a class that you create yourself, use :func:`~flogin.caching.AsyncCache.stats` instead.
+
+    Attributes
+    ----------
+    size: :class:`int`
+        The amount of entries that are currently cached, including ones that have expired but have not been removed yet
+    in_flight: :class:`int`
+        The amount of keys that are currently being computed
+    hits: :class:`int`
+        The total amount of lookups that found an entry
+    misses: :class:`int`
+        The total amount of lookups that did not find an entry
+    deduplicated: :class:`int`
+        The total amount of misses that waited for a computation that was already running, instead of starting a new one
+    evicted: :class:`int`
+        The total amount of entries that were removed to stay within the max size
+    expired: :class:`int`
+        The total amount of entries that were removed because their ttl passed
+    """
+
+    __slots__ = (
+        "size",
+        "in_flight",
+        "hits",
+        "misses",
+        "deduplicated",
+        "evicted",
+        "expired",
+    )
+
+    def __init__(
+        self,
+        *,
+        size: int = 0,
+        in_flight: int = 0,
+        hits: int = 0,
+        misses: int = 0,
+        deduplicated: int = 0,
+        evicted: int = 0,
+        expired: int = 0,
+    ) -> None:
+        self.size = size
+        self.in_flight = in_flight
+        self.hits = hits
+        self.misses = misses
+        self.deduplicated = deduplicated
+        self.evicted = evicted
+        self.expired = expired
+
+    @property
+    def hit_rate(self) -> float:
+        """:class:`float`: The fraction of lookups that found an entry, from ``0`` to ``1``. This is ``0`` if there were no lookups."""
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self) -> str:
+        args = " ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"<{self.__class__.__name__} {args}>"
+
+
+class _Entry:
+    __slots__ = "value", "expires", "uses"
+
+    def __init__(self, value: Any, expires: float | None) -> None:
+        self.value = value
+        self.expires = expires
+        self.uses = 1
+
+
+class _InFlight:
+    __slots__ = "task", "waiters"
+
+    def __init__(self, task: asyncio.Task[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncCache(Generic[T]):
+    r"""A size bounded cache for the results of coroutines.
+
+    Entries are removed once the cache is full, either the least recently used one (``"lru"``) or the least frequently used one (``"lfu"``), and once their ttl passes. Concurrent calls to :func:`get_or_compute` with the same key share a single computation, and exceptions are never cached.
+
+    This is what :func:`~flogin.utils.cached_coro` and :func:`~flogin.utils.cached_gen` use, and the instance can be accessed with the ``cache`` attribute of the decorated function.
+
+    Parameters
+    ----------
+    max_size: :class:`int` | None
+        The max amount of entries to keep. ``None`` means unlimited. Defaults to ``128``
+    ttl: :class:`float` | None
+        The amount of seconds that an entry is valid for. ``None`` means forever. Defaults to ``None``
+    policy: Literal["lru", "lfu"]
+        Which entry to remove once the cache is full. Defaults to ``"lru"``
+
+    Attributes
+    ----------
+    max_size: :class:`int` | None
+        The max amount of entries to keep
+    ttl: :class:`float` | None
+        The amount of seconds that an entry is valid for
+    policy: Literal["lru", "lfu"]
+        Which entry to remove once the cache is full
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int | None = 128,
+        ttl: float | None = None,
+        policy: EvictionPolicy = "lru",
+    ) -> None:
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"policy must be 'lru' or 'lfu', not {policy!r}")
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.policy = policy
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # lfu only: the keys with each amount of uses, from least to most recently used
+        self._uses: defaultdict[int, OrderedDict[Hashable, None]] = defaultdict(
+            OrderedDict
+        )
+        self._min_uses = 0
+        self._in_flight: dict[Hashable, _InFlight] = {}
+        self._hits = 0
+        self._misses = 0
+        self._deduplicated = 0
+        self._evicted = 0
+        self._expired = 0
+
+    def _touch(self, key: Hashable, entry: _Entry) -> None:
+        if self.policy == "lru":
+            self._entries.move_to_end(key)
+            return
+
+        bucket = self._uses[entry.uses]
+        del bucket[key]
+        if not bucket:
+            del self._uses[entry.uses]
+            if self._min_uses == entry.uses:
+                self._min_uses += 1
+        entry.uses += 1
+        self._uses[entry.uses][key] = None
+
+    def _remove(self, key: Hashable) -> _Entry | None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and self.policy == "lfu":
+            bucket = self._uses[entry.uses]
+            del bucket[key]
+            if not bucket:
+                del self._uses[entry.uses]
+        return entry
+
+    def _evict(self) -> None:
+        if self.policy == "lru":
+            key = next(iter(self._entries))
+        else:
+            if self._min_uses not in self._uses:
+                self._min_uses = min(self._uses)
+            key = next(iter(self._uses[self._min_uses]))
+
+        self._remove(key)
+        self._evicted += 1
+
+    def _lookup(self, key: Hashable) -> _Entry | None:
+        entry = self._entries.get(key)
+
+        if entry is not None and entry.expires is not None:
+            if entry.expires <= time.monotonic():
+                self._remove(key)
+                self._expired += 1
+                entry = None
+
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._touch(key, entry)
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> T | Any:
+        r"""Gets a cached value.
+
+        Parameters
+        ----------
+        key: Hashable
+            The key
+        default: Any
+            What to return if the key is not cached, or has expired. Defaults to ``None``
+
+        Returns
+        -------
+        Any
+        """
+
+        entry = self._lookup(key)
+        return default if entry is None else entry.value
+
+    def set(self, key: Hashable, value: T) -> None:
+        r"""Caches a value, replacing the current value of the key if there is one.
+
+        Parameters
+        ----------
+        key: Hashable
+            The key
+        value: Any
+            The value
+        """
+
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            entry.value = value
+            entry.expires = expires
+            self._touch(key, entry)
+            return
+
+        if self.max_size is not None:
+            while len(self._entries) >= self.max_size:
+                self._evict()
+
+        self._entries[key] = _Entry(value, expires)
+        if self.policy == "lfu":
+            self._uses[1][key] = None
+            self._min_uses = 1
+
+    async def get_or_compute(
+        self, key: Hashable, factory: Callable[[], Awaitable[T]]
+    ) -> T:
+        r"""|coro|
+
+        Gets a cached value, or computes and caches it if it is not cached.
+
+        If the key is already being computed, this waits for that computation instead of starting a new one. The computation is only cancelled once every caller that is waiting for it has been cancelled.
+
+        Parameters
+        ----------
+        key: Hashable
+            The key
+        factory: Callable[[], Awaitable[Any]]
+            A function that returns an awaitable which computes the value
+
+        Raises
+        ------
+        Exception
+            Any exception that the computation raised. Exceptions are not cached.
+
+        Returns
+        -------
+        Any
+            The value
+        """
+
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry.value
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = self._start(key, factory)
+        else:
+            self._deduplicated += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def refresh(
+        self, key: Hashable, factory: Callable[[], Awaitable[T]]
+    ) -> asyncio.Future[T]:
+        r"""Computes a key again in the background, while its current value stays cached until the new one is ready.
+
+        If the key is already being computed, that computation is used instead of starting a new one.
+
+        Parameters
+        ----------
+        key: Hashable
+            The key
+        factory: Callable[[], Awaitable[Any]]
+            A function that returns an awaitable which computes the value
+
+        Returns
+        -------
+        :class:`asyncio.Future`
+            The computation, which is not cancelled if the caller stops waiting for it
+        """
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = self._start(key, factory)
+        return flight.task
+
+    def _start(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> _InFlight:
+        task = asyncio.ensure_future(factory())
+        flight = _InFlight(task)
+        self._in_flight[key] = flight
+        task.add_done_callback(functools.partial(self._finish, key, flight))
+        return flight
+
+    def _finish(
+        self, key: Hashable, flight: _InFlight, task: asyncio.Future[T]
+    ) -> None:
+        # the key could have been invalidated while it was being computed, in which case the value is stale
+        current = self._in_flight.get(key) is flight
+        if current:
+            del self._in_flight[key]
+
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None and current:
+            self.set(key, task.result())
+        elif error is not None:
+            LOG.debug(f"Not caching {key!r}, since computing it raised {error!r}")
+
+    def invalidate(self, key: Hashable) -> bool:
+        r"""Removes a key from the cache. If the key is being computed, the computation continues, but its value is not cached.
+
+        Parameters
+        ----------
+        key: Hashable
+            The key
+
+        Returns
+        -------
+        :class:`bool`
+            Whether or not the key was cached or being computed
+        """
+
+        flight = self._in_flight.pop(key, None)
+        return self._remove(key) is not None or flight is not None
+
+    def clear(self) -> None:
+        r"""Removes every entry from the cache. Running computations continue, but their values are not cached."""
+
+        self._entries.clear()
+        self._uses.clear()
+        self._in_flight.clear()
+
+    def stats(self) -> CacheStats:
+        r"""Gets a snapshot of the cache's statistics.
+
+        Returns
+        -------
+        :class:`~flogin.caching.CacheStats`
+        """
+
+        return CacheStats(
+            size=len(self._entries),
+            in_flight=len(self._in_flight),
+            hits=self._hits,
+            misses=self._misses,
+            deduplicated=self._deduplicated,
+            evicted=self._evicted,
+            expired=self._expired,
+        )
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore
+        return entry is not None and (
+            entry.expires is None or entry.expires > time.monotonic()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} policy={self.policy!r} max_size={self.max_size!r} ttl={self.ttl!r} size={len(self)!r}>"
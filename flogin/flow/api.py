@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, ParamSpec
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Iterable, ParamSpec
 
-from .fuzzy_search import FuzzySearchResult
+from ..caching import AsyncCache
+from ..utils import MISSING
+from .fuzzy_search import FuzzySearchResult, could_match
 from .plugin_metadata import PluginMetadata
 
 ATS = ParamSpec("ATS")
+LOG = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from ..jsonrpc import ExecuteResponse, JsonRPCClient, Result
@@ -18,10 +23,26 @@ class FlowLauncherAPI:
 
     .. NOTE::
         Do not initialize this class yourself, instead use :class:`~flogin.plugin.Plugin`'s :attr:`~flogin.plugin.Plugin.api` attribute to get an instance.
+
+    .. NOTE::
+        Every method raises :class:`~flogin.jsonrpc.errors.JsonRPCRequestTimeout` if flow does not respond within its ``timeout``.
+
+    Attributes
+    --------
+    fuzzy_search_cache: Optional[:class:`~flogin.caching.AsyncCache`]
+        The cache of :func:`fuzzy_search` results, or ``None`` if it is disabled with the ``fuzzy_search_cache_size`` option of :class:`~flogin.plugin.Plugin`
     """
 
-    def __init__(self, jsonrpc: JsonRPCClient):
+    def __init__(
+        self, jsonrpc: JsonRPCClient, *, fuzzy_search_cache_size: int | None = 1024
+    ):
         self.jsonrpc = jsonrpc
+        self.fuzzy_search_cache: AsyncCache[FuzzySearchResult] | None = (
+            None
+            if fuzzy_search_cache_size == 0
+            else AsyncCache(max_size=fuzzy_search_cache_size)
+        )
+        self._search_precision: int | None = None
 
     async def __call__(self, method: str, *args: Any, **kwargs: Any) -> ExecuteResponse:
         from ..jsonrpc import ExecuteResponse
@@ -30,31 +51,164 @@ class FlowLauncherAPI:
         return ExecuteResponse()
 
     async def fuzzy_search(
-        self, text: str, text_to_compare_it_to: str
+        self, text: str, text_to_compare_it_to: str, *, timeout: float | None = MISSING
     ) -> FuzzySearchResult:
         r"""|coro|
 
         Asks flow how similiar two strings are.
 
+        Results are cached in :attr:`fuzzy_search_cache` by the pair of texts, and concurrent calls with the same texts share one request. The cache is cleared once flow's search precision changes, which is noticed whenever flow responds to a request, or :func:`~flogin.plugin.Plugin.fetch_flow_settings` is used.
+
         Parameters
         --------
         text: :class:`str`
             The text
         text_to_compare_it_to: :class:`str`
             The text you want to compare the other text to
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
         :class:`~flogin.flow.fuzzy_search.FuzzySearchResult`
         """
 
+        cache = self.fuzzy_search_cache
+        if cache is None:
+            return await self._fuzzy_search(text, text_to_compare_it_to, timeout)
+
+        return await cache.get_or_compute(
+            (text, text_to_compare_it_to),
+            lambda: self._fuzzy_search(text, text_to_compare_it_to, timeout),
+        )
+
+    async def _fuzzy_search(
+        self, text: str, text_to_compare_it_to: str, timeout: float | None
+    ) -> FuzzySearchResult:
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("FuzzySearch", [text, text_to_compare_it_to])
+        res = await self.jsonrpc.request(
+            "FuzzySearch", [text, text_to_compare_it_to], timeout=timeout
+        )
         assert not isinstance(res, ErrorResponse)
-        return FuzzySearchResult(res["result"])
+        result = FuzzySearchResult(res["result"])
+        if self._set_search_precision(result.search_precision):
+            # clearing the cache also forgot that this request was running, so it would not be cached otherwise
+            self.fuzzy_search_cache.set((text, text_to_compare_it_to), result)  # type: ignore
+        return result
+
+    def _set_search_precision(self, precision: int) -> bool:
+        if precision == self._search_precision:
+            return False
+
+        # the scores of cached results depend on the precision, so they are all stale now.
+        # results that are still being requested are not cached either, since clearing forgets them
+        if self._search_precision is not None and self.fuzzy_search_cache is not None:
+            LOG.debug(
+                f"Search precision changed from {self._search_precision!r} to {precision!r}, clearing the fuzzy search cache"
+            )
+            self.fuzzy_search_cache.clear()
+            self._search_precision = precision
+            return True
+
+        self._search_precision = precision
+        return False
+
+    async def fuzzy_search_many(
+        self,
+        text: str,
+        candidates: Iterable[str],
+        *,
+        max_in_flight: int = 32,
+        prefilter: bool = True,
+        timeout: float | None = MISSING,
+    ) -> list[FuzzySearchResult]:
+        r"""|coro|
+
+        Asks flow how similiar a text is to each of the candidates.
+
+        The requests are pipelined, with up to ``max_in_flight`` of them waiting for a response at once, and candidates that can not match are filtered out with :func:`~flogin.flow.fuzzy_search.could_match` before anything is sent to flow.
 
-    async def change_query(self, new_query: str, requery: bool = False) -> None:
+        .. NOTE::
+            Flow can match pinyin and translated alphabets, which :func:`~flogin.flow.fuzzy_search.could_match` does not take into account. Disable ``prefilter`` if you rely on that.
+
+        Parameters
+        --------
+        text: :class:`str`
+            The text
+        candidates: Iterable[:class:`str`]
+            The texts you want to compare the other text to
+        max_in_flight: :class:`int`
+            The max amount of requests that can wait for a response at once. Defaults to ``32``
+        prefilter: :class:`bool`
+            Whether or not to skip the candidates that can not match. The results of skipped candidates are not successful, have a score of ``0``, and have the search precision of the other results, or ``None`` if every candidate was skipped. Defaults to ``True``
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond to each request, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
+        Returns
+        --------
+        list[:class:`~flogin.flow.fuzzy_search.FuzzySearchResult`]
+            The results, in the same order as the candidates
+        """
+
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        candidates = list(candidates)
+        results: list[FuzzySearchResult | None] = [None] * len(candidates)
+
+        if prefilter:
+            pending = [
+                index
+                for index, candidate in enumerate(candidates)
+                if could_match(text, candidate)
+            ]
+        else:
+            pending = list(range(len(candidates)))
+
+        # every worker pulls the next candidate from the same iterator, which keeps the window full
+        queue = iter(pending)
+
+        async def worker() -> None:
+            for index in queue:
+                results[index] = await self.fuzzy_search(
+                    text, candidates[index], timeout=timeout
+                )
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(max_in_flight, len(pending)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+
+        precision = next(
+            (result.search_precision for result in results if result is not None), None
+        )
+        return [
+            (
+                FuzzySearchResult(
+                    {
+                        "success": False,
+                        "score": 0,
+                        "rawScore": 0,
+                        "matchData": [],
+                        "searchPrecision": precision,
+                    }
+                )
+                if result is None
+                else result
+            )
+            for result in results
+        ]
+
+    async def change_query(
+        self, new_query: str, requery: bool = False, *, timeout: float | None = MISSING
+    ) -> None:
         r"""|coro|
 
         Change the query in flow launcher's menu.
@@ -65,6 +219,8 @@ class FlowLauncherAPI:
             The new query to change it to
         requery: :class:`bool`
             Whether or not to re-send a query request in the event that the `new_query` is the same as the current query
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -73,10 +229,14 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("ChangeQuery", [new_query, requery])
+        res = await self.jsonrpc.request(
+            "ChangeQuery", [new_query, requery], timeout=timeout
+        )
         assert not isinstance(res, ErrorResponse)
 
-    async def show_error_message(self, title: str, text: str) -> None:
+    async def show_error_message(
+        self, title: str, text: str, *, timeout: float | None = MISSING
+    ) -> None:
         r"""|coro|
 
         Triggers an error message in the form of a windows notification
@@ -87,6 +247,8 @@ class FlowLauncherAPI:
             The title of the notification
         text: :class:`str`
             The content of the notification
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -95,7 +257,7 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("ShowMsgError", [title, text])
+        res = await self.jsonrpc.request("ShowMsgError", [title, text], timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
     async def show_notification(
@@ -104,6 +266,8 @@ class FlowLauncherAPI:
         content: str,
         icon: str = "",
         use_main_window_as_owner: bool = True,
+        *,
+        timeout: float | None = MISSING,
     ) -> None:
         r"""|coro|
 
@@ -119,6 +283,8 @@ class FlowLauncherAPI:
             The icon to be shown with the notification, defaults to `""`
         use_main_window_as_owner: :class:`bool`
             Whether or not to use the main flow window as the notification's owner. Defaults to `True`
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -128,15 +294,20 @@ class FlowLauncherAPI:
         from ..jsonrpc import ErrorResponse  # circular import
 
         res = await self.jsonrpc.request(
-            "ShowMsg", [title, content, icon, use_main_window_as_owner]
+            "ShowMsg", [title, content, icon, use_main_window_as_owner], timeout=timeout
         )
         assert not isinstance(res, ErrorResponse)
 
-    async def open_settings_menu(self) -> None:
+    async def open_settings_menu(self, *, timeout: float | None = MISSING) -> None:
         r"""|coro|
 
         This method tells flow to open up the settings menu.
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         None
@@ -144,10 +315,12 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("OpenSettingDialog")
+        res = await self.jsonrpc.request("OpenSettingDialog", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def open_url(self, url: str, in_private: bool = False) -> None:
+    async def open_url(
+        self, url: str, in_private: bool = False, *, timeout: float | None = MISSING
+    ) -> None:
         r"""|coro|
 
         Open up a url in the user's preferred browser, which was set in their Flow Launcher settings.
@@ -158,6 +331,8 @@ class FlowLauncherAPI:
             The url to be opened in the webbrowser
         in_private: :class:`bool`
             Whether or not to open up the url in a private window
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -166,10 +341,12 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("OpenUrl", [url, in_private])
+        res = await self.jsonrpc.request("OpenUrl", [url, in_private], timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def run_shell_cmd(self, cmd: str, filename: str = "cmd.exe") -> None:
+    async def run_shell_cmd(
+        self, cmd: str, filename: str = "cmd.exe", *, timeout: float | None = MISSING
+    ) -> None:
         r"""|coro|
 
         Tell flow to run a shell command
@@ -180,6 +357,8 @@ class FlowLauncherAPI:
             The command to be run
         filename: :class:`str`
             The name of the command prompt instance, defaults to `cmd.exe`
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -188,28 +367,38 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("ShellRun", [cmd, filename])
+        res = await self.jsonrpc.request("ShellRun", [cmd, filename], timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def restart_flow_launcher(self) -> None:
+    async def restart_flow_launcher(self, *, timeout: float | None = None) -> None:
         r"""|coro|
 
         This method tells flow launcher to initiate a restart of flow launcher.
 
         .. WARNING::
             Expect this method to never finish, so clean up and prepare for the plugin to be shut down before calling this.
+
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. Since flow restarts instead of responding, this defaults to ``None``, which means no timeout.
         """
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = self.jsonrpc.request("RestartApp")
+        res = await self.jsonrpc.request("RestartApp", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def save_all_app_settings(self) -> None:
+    async def save_all_app_settings(self, *, timeout: float | None = MISSING) -> None:
         r"""|coro|
 
         This method tells flow to save all app settings.
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         None
@@ -217,14 +406,19 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("SaveAppAllSettings")
+        res = await self.jsonrpc.request("SaveAppAllSettings", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def save_plugin_settings(self) -> Any:
+    async def save_plugin_settings(self, *, timeout: float | None = MISSING) -> Any:
         r"""|coro|
 
         This method tells flow to save plugin settings
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         None
@@ -232,15 +426,20 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("SavePluginSettings")
+        res = await self.jsonrpc.request("SavePluginSettings", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
         return res["result"]
 
-    async def reload_all_plugin_data(self) -> None:
+    async def reload_all_plugin_data(self, *, timeout: float | None = MISSING) -> None:
         r"""|coro|
 
         This method tells flow to trigger a reload of all plugins.
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         None
@@ -248,14 +447,19 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("ReloadAllPluginDataAsync")
+        res = await self.jsonrpc.request("ReloadAllPluginDataAsync", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def show_main_window(self) -> None:
+    async def show_main_window(self, *, timeout: float | None = MISSING) -> None:
         """|coro|
 
         This method tells flow to show the main window
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         None
@@ -263,14 +467,19 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("ShowMainWindow")
+        res = await self.jsonrpc.request("ShowMainWindow", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def hide_main_window(self) -> None:
+    async def hide_main_window(self, *, timeout: float | None = MISSING) -> None:
         r"""|coro|
 
         This method tells flow to hide the main window
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         None
@@ -278,14 +487,19 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("HideMainWindow")
+        res = await self.jsonrpc.request("HideMainWindow", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def is_main_window_visible(self) -> bool:
+    async def is_main_window_visible(self, *, timeout: float | None = MISSING) -> bool:
         r"""|coro|
 
         This method asks flow if the main window is visible or not
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         :class:`bool`
@@ -293,11 +507,11 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("IsMainWindowVisible")
+        res = await self.jsonrpc.request("IsMainWindowVisible", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
         return res["result"]
 
-    async def check_for_updates(self) -> None:
+    async def check_for_updates(self, *, timeout: float | None = MISSING) -> None:
         r"""|coro|
 
         This tells flow launcher to check for updates to flow launcher
@@ -305,6 +519,11 @@ class FlowLauncherAPI:
         .. NOTE::
             This tells flow launcher to check for updates to flow launcher, not your plugin
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         None
@@ -312,14 +531,21 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("CheckForNewUpdate")
+        res = await self.jsonrpc.request("CheckForNewUpdate", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
 
-    async def get_all_plugins(self) -> list[PluginMetadata]:
+    async def get_all_plugins(
+        self, *, timeout: float | None = MISSING
+    ) -> list[PluginMetadata]:
         r"""|coro|
 
         Get the metadata of all plugins that the user has installed
 
+        Parameters
+        --------
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
+
         Returns
         --------
         list[:class:`~flogin.flow.plugin_metadata.PluginMetadata`]
@@ -327,11 +553,13 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("GetAllPlugins")
+        res = await self.jsonrpc.request("GetAllPlugins", timeout=timeout)
         assert not isinstance(res, ErrorResponse)
         return [PluginMetadata(plugin["metadata"], self) for plugin in res["result"]]
 
-    async def add_keyword(self, plugin_id: str, keyword: str) -> None:
+    async def add_keyword(
+        self, plugin_id: str, keyword: str, *, timeout: float | None = MISSING
+    ) -> None:
         r"""|coro|
 
         Registers a new keyword for a plugin with flow launcher.
@@ -342,6 +570,8 @@ class FlowLauncherAPI:
             The id of the plugin that you want the keyword added to
         keyword: :class:`str`
             The keyword to add
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -350,10 +580,14 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("AddActionKeyword", [plugin_id, keyword])
+        res = await self.jsonrpc.request(
+            "AddActionKeyword", [plugin_id, keyword], timeout=timeout
+        )
         assert not isinstance(res, ErrorResponse)
 
-    async def remove_keyword(self, plugin_id: str, keyword: str) -> None:
+    async def remove_keyword(
+        self, plugin_id: str, keyword: str, *, timeout: float | None = MISSING
+    ) -> None:
         r"""|coro|
 
         Unregisters a keyword for a plugin with flow launcher.
@@ -364,6 +598,8 @@ class FlowLauncherAPI:
             The ID of the plugin that you want to remove the keyword from
         keyword: :class:`str`
             The keyword that you want to remove
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -372,10 +608,18 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("RemoveActionKeyword", [plugin_id, keyword])
+        res = await self.jsonrpc.request(
+            "RemoveActionKeyword", [plugin_id, keyword], timeout=timeout
+        )
         assert not isinstance(res, ErrorResponse)
 
-    async def open_directory(self, directory: str, file: str | None = None) -> None:
+    async def open_directory(
+        self,
+        directory: str,
+        file: str | None = None,
+        *,
+        timeout: float | None = MISSING,
+    ) -> None:
         r"""|coro|
 
         Opens up a folder in file explorer. If a file is provided, the file will be pre-selected.
@@ -386,6 +630,8 @@ class FlowLauncherAPI:
             The directory you want to open
         file: Optional[:class:`str`]
             The file in the directory that you want to highlight, defaults to `None`
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         --------
@@ -394,10 +640,14 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse  # circular import
 
-        res = await self.jsonrpc.request("OpenDirectory", [directory, file])
+        res = await self.jsonrpc.request(
+            "OpenDirectory", [directory, file], timeout=timeout
+        )
         assert not isinstance(res, ErrorResponse)
 
-    async def update_results(self, raw_query: str, results: list[Result]) -> None:
+    async def update_results(
+        self, raw_query: str, results: list[Result], *, timeout: float | None = MISSING
+    ) -> None:
         r"""|coro|
 
         Tells flow to change the results shown to the user
@@ -411,6 +661,8 @@ class FlowLauncherAPI:
             Only change the results if the current raw query is the same as this
         results: list[:class:`~flogin.jsonrpc.results.Result`]
             The new results
+        timeout: Optional[:class:`float`]
+            How long to wait for flow to respond, in seconds. ``None`` means no timeout. Defaults to the ``request_timeout`` option of :class:`~flogin.plugin.Plugin`.
 
         Returns
         -------
@@ -419,9 +671,11 @@ class FlowLauncherAPI:
 
         from ..jsonrpc import ErrorResponse, QueryResponse  # circular import
 
-        self.jsonrpc.plugin._results.update({res.slug: res for res in results})
+        self.jsonrpc.plugin._results.update(results)
 
         res = await self.jsonrpc.request(
-            "UpdateResults", [raw_query, QueryResponse(results).to_dict()]
+            "UpdateResults",
+            [raw_query, QueryResponse(results).to_dict()],
+            timeout=timeout,
         )
         assert not isinstance(res, ErrorResponse)
@@ -1,24 +1,265 @@
+from __future__ import annotations
+
 from .base import Base, add_prop
+from .enums import SearchPrecisionScore
 
-__all__ = ("FuzzySearchResult",)
+__all__ = ("FuzzySearchResult", "fuzzy_match", "could_match")
 
 
 class FuzzySearchResult(Base):
     r"""A class which represents the result given from flow launcher to a fuzzy search request
 
     .. NOTE::
-        This is not intended to be a class that you create yourself, use :func:`~flogin.flow.api.FlowLauncherAPI.fuzzy_search` instead.
+        This is not intended to be a class that you create yourself, use :func:`~flogin.flow.api.FlowLauncherAPI.fuzzy_search` or :func:`~flogin.flow.fuzzy_search.fuzzy_match` instead.
 
     Attributes
     --------
     score: :class:`int`
-        The score of the result
+        The score of the result, which is ``0`` if it does not meet the search precision
     highlight_data: list[:class:`int`]
         The highlight data included with the result
     search_percision: :class:`int`
         The perision of the result
+    success: :class:`bool`
+        Whether or not the text matched
+    raw_score: :class:`int` | None
+        The score of the result before the search precision was applied
     """
 
     score: int = add_prop("score")
     highlight_data: list[int] = add_prop("matchData")
     search_precision: int = add_prop("searchPrecision")
+    success: bool = add_prop("success", default=True)
+    raw_score: int | None = add_prop("rawScore", default=None)
+
+
+def _match_result(
+    success: bool,
+    precision: int,
+    match_data: list[int] | None = None,
+    raw_score: int = 0,
+) -> FuzzySearchResult:
+    return FuzzySearchResult(
+        {
+            "success": success,
+            "score": raw_score if raw_score >= precision else 0,
+            "rawScore": raw_score,
+            "matchData": match_data or [],
+            "searchPrecision": precision,
+        }
+    )
+
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # flow lowers each char on its own, which never changes the length of the text
+        lowered = "".join(char.lower()[0] for char in text)
+    return lowered
+
+
+def could_match(text: str, text_to_compare_it_to: str) -> bool:
+    r"""A cheap check for whether :func:`~flogin.flow.fuzzy_search.fuzzy_match` could match two strings.
+
+    Every match needs the characters of the text, without whitespace, to appear in the same order in the text that it is compared to, so if this returns ``False``, the strings are guaranteed to not match. Flow's pinyin and alphabet translation is not taken into account.
+
+    Parameters
+    --------
+    text: :class:`str`
+        The text, such as the query
+    text_to_compare_it_to: :class:`str`
+        The text you want to compare the other text to
+
+    Returns
+    --------
+    :class:`bool`
+    """
+
+    remaining = iter(_lower(text_to_compare_it_to))
+    return all(char in remaining for char in _lower(text) if not char.isspace())
+
+
+def _closest_space_index(space_indices: list[int], first_match_index: int) -> int:
+    closest = -1
+    for index in space_indices:
+        if index >= first_match_index:
+            break
+        closest = index
+    return closest
+
+
+def _search_score(
+    query: str,
+    text: str,
+    first_index: int,
+    match_length: int,
+    all_substrings_contained: bool,
+) -> int:
+    # a match near the start of the text, with chars close to each other, scores higher
+    score = 100 * (len(query) + 1) // ((1 + first_index) + (match_length + 1))
+
+    # shorter texts score higher
+    if len(text) - len(query) < 5:
+        score += 20
+    elif len(text) - len(query) < 10:
+        score += 10
+
+    if all_substrings_contained:
+        count = sum(1 for char in query if not char.isspace())
+        threshold = 4
+        if count <= threshold:
+            score += count * 10
+        else:
+            score += threshold * 10 + (count - threshold) * 5
+
+    if query.casefold() == text.casefold():
+        score += 10
+
+    return score
+
+
+def fuzzy_match(
+    text: str,
+    text_to_compare_it_to: str,
+    *,
+    precision: SearchPrecisionScore | int = SearchPrecisionScore.regular,
+) -> FuzzySearchResult:
+    r"""Checks how similiar two strings are, without asking flow.
+
+    This is a port of the fuzzy matching that flow uses for :func:`~flogin.flow.api.FlowLauncherAPI.fuzzy_search`, and gives the same scores and highlight data, but runs in your plugin's process so that it does not need a request to flow for every comparison. Flow's pinyin and alphabet translation is not included.
+
+    Parameters
+    --------
+    text: :class:`str`
+        The text, such as the query
+    text_to_compare_it_to: :class:`str`
+        The text you want to compare the other text to
+    precision: :class:`~flogin.flow.enums.SearchPrecisionScore` | :class:`int`
+        The min score for a result to have a :attr:`~flogin.flow.fuzzy_search.FuzzySearchResult.score` other than ``0``, which is the same as flow's "Query Search Precision" setting. Defaults to :attr:`~flogin.flow.enums.SearchPrecisionScore.regular`
+
+    Returns
+    --------
+    :class:`~flogin.flow.fuzzy_search.FuzzySearchResult`
+    """
+
+    if isinstance(precision, SearchPrecisionScore):
+        precision = precision.value
+
+    query = text.strip()
+    if not query or not could_match(query, text_to_compare_it_to):
+        return _match_result(False, precision)
+
+    compare = text_to_compare_it_to
+    compare_lower = _lower(compare)
+    query_lower = _lower(query)
+    query_length = len(query)
+
+    substrings = query_lower.split()
+    substring_index = 0
+    substring = substrings[0]
+    substring_char_index = 0
+
+    acronym_query_index = 0
+    acronym_match_data: list[int] = []
+    acronyms_total = 0
+    acronyms_matched = 0
+
+    first_match_index = -1
+    first_match_index_in_word = -1
+    last_match_index = 0
+    all_substrings_matched = False
+    match_found_in_previous_loop = False
+    all_substrings_contained = True
+
+    index_list: list[int] = []
+    space_indices: list[int] = []
+
+    after_space = True
+    for compare_index, char in enumerate(compare_lower):
+        original = compare[compare_index]
+        acronym_char = after_space or original.isupper()
+        # flow compares the char to the numbers 0-9 instead of the chars '0'-'9', so only control chars count
+        acronym_number = ord(original) <= 9
+        # a run of numbers only counts as one acronym
+        acronym_count = acronym_char or (acronym_number and after_space)
+        after_space = original.isspace()
+
+        # once every char of the query matched an acronym, only the remaining acronyms are counted
+        if acronym_query_index >= query_length and acronyms_matched == query_length:
+            if acronym_count:
+                acronyms_total += 1
+            continue
+
+        if acronym_query_index >= query_length:
+            break
+
+        if char == " " and substring_index == 0:
+            space_indices.append(compare_index)
+
+        if (acronym_char or acronym_number) and char == query_lower[
+            acronym_query_index
+        ]:
+            acronym_match_data.append(compare_index)
+            acronyms_matched += 1
+            acronym_query_index += 1
+
+        if acronym_count:
+            acronyms_total += 1
+
+        if all_substrings_matched or char != substring[substring_char_index]:
+            match_found_in_previous_loop = False
+            continue
+
+        if first_match_index < 0:
+            first_match_index = compare_index
+
+        if substring_char_index == 0:
+            match_found_in_previous_loop = True
+            first_match_index_in_word = compare_index
+        elif not match_found_in_previous_loop:
+            # check if the whole substring so far matches right before this char, which is a better match
+            start = compare_index - substring_char_index
+            if compare_lower[start:compare_index] == substring[:substring_char_index]:
+                match_found_in_previous_loop = True
+                if substring_index == 0:
+                    first_match_index = start
+                index_list = [
+                    index for index in index_list if index < first_match_index_in_word
+                ]
+                index_list.extend(range(start, compare_index))
+
+        last_match_index = compare_index + 1
+        index_list.append(compare_index)
+        substring_char_index += 1
+
+        if substring_char_index == len(substring):
+            all_substrings_contained = (
+                match_found_in_previous_loop and all_substrings_contained
+            )
+            substring_index += 1
+            all_substrings_matched = substring_index >= len(substrings)
+            if all_substrings_matched:
+                continue
+
+            substring = substrings[substring_index]
+            substring_char_index = 0
+
+    if acronyms_matched > 0 and acronyms_matched == query_length and acronyms_total:
+        acronym_score = acronyms_matched * 100 // acronyms_total
+        if acronym_score >= precision:
+            return _match_result(
+                True, precision, list(dict.fromkeys(acronym_match_data)), acronym_score
+            )
+
+    if all_substrings_matched:
+        nearest_space_index = _closest_space_index(space_indices, first_match_index)
+        score = _search_score(
+            query,
+            compare,
+            first_match_index - nearest_space_index - 1,
+            last_match_index - first_match_index,
+            all_substrings_contained,
+        )
+        return _match_result(True, precision, list(dict.fromkeys(index_list)), score)
+
+    return _match_result(False, precision)
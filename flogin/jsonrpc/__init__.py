@@ -1,4 +1,5 @@
 from .client import *
+from .codec import *
 from .errors import *
 from .responses import *
 from .results import *
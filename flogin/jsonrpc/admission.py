@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Coroutine, Literal
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ("AdmissionController", "MethodStats")
+
+RequestFactory = Callable[[], Coroutine[Any, Any, Any]]
+ShedCallback = Callable[[int], Coroutine[Any, Any, Any]]
+
+
+class MethodStats:
+    r"""A snapshot of the admission statistics for a single jsonrpc method.
+
+    .. NOTE::
+        This is not intended to be a class that you create yourself, use :func:`~flogin.jsonrpc.admission.AdmissionController.stats` instead.
+
+    Attributes
+    ----------
+    method: :class:`str`
+        The jsonrpc method that these stats are for
+    in_flight: :class:`int`
+        The amount of requests that are currently running
+    queued: :class:`int`
+        The amount of requests that are waiting to be ran
+    peak_queued: :class:`int`
+        The highest amount of requests that have been waiting at once
+    admitted: :class:`int`
+        The total amount of requests that have been started
+    shed: :class:`int`
+        The total amount of requests that were dropped because of overflow
+    """
+
+    __slots__ = "method", "in_flight", "queued", "peak_queued", "admitted", "shed"
+
+    def __init__(
+        self,
+        method: str,
+        *,
+        in_flight: int = 0,
+        queued: int = 0,
+        peak_queued: int = 0,
+        admitted: int = 0,
+        shed: int = 0,
+    ) -> None:
+        self.method = method
+        self.in_flight = in_flight
+        self.queued = queued
+        self.peak_queued = peak_queued
+        self.admitted = admitted
+        self.shed = shed
+
+    def __repr__(self) -> str:
+        args = " ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"<{self.__class__.__name__} {args}>"
+
+
+class _MethodState:
+    __slots__ = "in_flight", "queue", "peak_queued", "admitted", "shed"
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.queue: deque[tuple[int, RequestFactory]] = deque()
+        self.peak_queued = 0
+        self.admitted = 0
+        self.shed = 0
+
+
+class AdmissionController:
+    r"""Limits how many requests of each method are ran at once, and keeps strong references to every task it starts.
+
+    When a method is at its limit, new requests are either queued until a running request finishes, or shed right away depending on ``overflow``. When the queue for a method is full, the oldest queued request is shed to make room, since newer requests (such as queries) are usually the ones that matter.
+
+    .. NOTE::
+        Do not initialize this class yourself, instead use the ``max_concurrent_requests``, ``max_queued_requests`` and ``request_overflow`` options of :class:`~flogin.plugin.Plugin`, and the :attr:`~flogin.jsonrpc.client.JsonRPCClient.admission` attribute to get the instance.
+
+    Attributes
+    ----------
+    default_limit: :class:`int` | None
+        The max amount of in-flight requests for methods without their own limit. ``None`` means unlimited.
+    limits: dict[:class:`str`, :class:`int` | None]
+        Per-method limits, which take priority over ``default_limit``. Requests for result callbacks (``flogin.action.<slug>``) all share the ``flogin.action`` key.
+    max_queued: :class:`int` | None
+        The max amount of queued requests per method. ``None`` means unlimited.
+    overflow: Literal["queue", "shed"]
+        What to do with requests that arrive while their method is at its limit
+    """
+
+    def __init__(
+        self,
+        *,
+        default_limit: int | None = 32,
+        limits: dict[str, int | None] | None = None,
+        max_queued: int | None = 128,
+        overflow: Literal["queue", "shed"] = "queue",
+        on_shed: ShedCallback | None = None,
+    ) -> None:
+        if overflow not in ("queue", "shed"):
+            raise ValueError(f"overflow must be 'queue' or 'shed', not {overflow!r}")
+
+        self.default_limit = default_limit
+        self.limits: dict[str, int | None] = limits or {}
+        self.max_queued = max_queued
+        self.overflow = overflow
+        self.on_shed = on_shed
+        self._states: dict[str, _MethodState] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _get_key(method: str) -> str:
+        # every result has its own action method, so they are grouped together to keep the amount of states bounded
+        if method.startswith("flogin.action."):
+            return "flogin.action"
+        return method
+
+    def get_limit(self, method: str) -> int | None:
+        r"""Gets the max amount of in-flight requests for a method.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The jsonrpc method
+
+        Returns
+        -------
+        :class:`int` | None
+        """
+
+        return self.limits.get(self._get_key(method), self.default_limit)
+
+    def _get_state(self, method: str) -> _MethodState:
+        try:
+            return self._states[method]
+        except KeyError:
+            state = self._states[method] = _MethodState()
+            return state
+
+    def spawn(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        r"""Creates a task and keeps a strong reference to it until it finishes.
+
+        Parameters
+        ----------
+        coro: :ref:`coroutine <coroutine>`
+            The coroutine to run
+
+        Returns
+        -------
+        :class:`asyncio.Task`
+        """
+
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def submit(self, method: str, request_id: int, factory: RequestFactory) -> None:
+        r"""Starts, queues, or sheds a request depending on how busy its method is.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The jsonrpc method of the request
+        request_id: :class:`int`
+            The id of the request
+        factory: Callable[[], :ref:`coroutine <coroutine>`]
+            A function that creates the coroutine that handles the request. It is only called once the request is started.
+        """
+
+        method = self._get_key(method)
+        state = self._get_state(method)
+        limit = self.get_limit(method)
+
+        if limit is None or state.in_flight < limit:
+            return self._start(method, state, factory)
+
+        if self.overflow == "shed" or self.max_queued == 0:
+            return self._shed(method, state, request_id)
+
+        if self.max_queued is not None and len(state.queue) >= self.max_queued:
+            old_id, _ = state.queue.popleft()
+            self._shed(method, state, old_id)
+
+        state.queue.append((request_id, factory))
+        state.peak_queued = max(state.peak_queued, len(state.queue))
+
+    def cancel(self, request_id: int) -> bool:
+        r"""Removes a request from the queue before it gets started.
+
+        Parameters
+        ----------
+        request_id: :class:`int`
+            The id of the request
+
+        Returns
+        -------
+        :class:`bool`
+            Whether or not a queued request with that id was found and removed
+        """
+
+        for state in self._states.values():
+            for item in state.queue:
+                if item[0] == request_id:
+                    state.queue.remove(item)
+                    return True
+        return False
+
+    def _start(self, method: str, state: _MethodState, factory: RequestFactory) -> None:
+        state.in_flight += 1
+        state.admitted += 1
+        task = self.spawn(factory())
+        task.add_done_callback(lambda _: self._on_done(method, state))
+
+    def _on_done(self, method: str, state: _MethodState) -> None:
+        state.in_flight -= 1
+        limit = self.get_limit(method)
+
+        while state.queue and (limit is None or state.in_flight < limit):
+            _, factory = state.queue.popleft()
+            self._start(method, state, factory)
+
+    def _shed(self, method: str, state: _MethodState, request_id: int) -> None:
+        state.shed += 1
+        LOG.warning(
+            f"Shedding request {request_id!r} for {method!r}, too many requests"
+        )
+        if self.on_shed is not None:
+            self.spawn(self.on_shed(request_id))
+
+    @property
+    def in_flight(self) -> int:
+        """:class:`int`: The total amount of requests that are currently running"""
+        return sum(state.in_flight for state in self._states.values())
+
+    @property
+    def queue_depth(self) -> int:
+        """:class:`int`: The total amount of requests that are waiting to be ran"""
+        return sum(len(state.queue) for state in self._states.values())
+
+    def stats(self) -> dict[str, MethodStats]:
+        r"""Gets a snapshot of the admission statistics for every method that has received a request.
+
+        Returns
+        -------
+        dict[:class:`str`, :class:`~flogin.jsonrpc.admission.MethodStats`]
+        """
+
+        return {
+            method: MethodStats(
+                method,
+                in_flight=state.in_flight,
+                queued=len(state.queue),
+                peak_queued=state.peak_queued,
+                admitted=state.admitted,
+                shed=state.shed,
+            )
+            for method, state in self._states.items()
+        }
@@ -1,23 +1,96 @@
-import json
-from typing import Any, Self
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Self
+
+from .codec import get_default_codec
+
+if TYPE_CHECKING:
+    from .codec import JsonCodec
 
 __all__ = ("Base",)
 
 
+def _convert_list(items: list[Any]) -> list[Any]:
+    return [item.to_dict() if isinstance(item, Base) else item for item in items]
+
+
+def compile_function(
+    name: str, lines: list[str], namespace: dict[str, Any]
+) -> Callable[..., Any]:
+    source = "\n".join(lines)
+    exec(source, namespace)  # the source is only built from identifiers and reprs
+    return namespace[name]
+
+
+def _lazy_to_dict(self: Base) -> dict[str, Any]:
+    r"""This converts the object into a json serializable dictionary
+
+    Returns
+    -------
+    dict[:class:`str`, Any]
+    """
+
+    # the serializer of each class is compiled on its first call, and replaces this function,
+    # unless the class overrides to_dict and only reaches this through super()
+    cls = type(self)
+    to_dict = cls.__dict__.get("_compiled_to_dict")
+    if to_dict is None:
+        to_dict = cls._compile_to_dict()
+        to_dict.__compiled_to_dict__ = True  # type: ignore
+        to_dict.__doc__ = _lazy_to_dict.__doc__
+        to_dict.__qualname__ = f"{cls.__qualname__}.to_dict"
+        cls._compiled_to_dict = to_dict  # type: ignore
+        if cls.__dict__.get("to_dict") is _lazy_to_dict:
+            cls.to_dict = to_dict  # type: ignore
+    return to_dict(self)
+
+
+_lazy_to_dict.__compiled_to_dict__ = True  # type: ignore
+_lazy_to_dict.__name__ = "to_dict"
+
+
 class Base:
     __slots__ = ()
     __jsonrpc_option_names__: dict[str, str] = {}
 
-    def to_dict(self) -> dict:
-        foo = {}
-        for name in self.__slots__:
-            item = getattr(self, name)
-            if isinstance(item, Base):
-                item = item.to_dict()
-            elif item and isinstance(item, list) and isinstance(item[0], Base):
-                item = [item.to_dict() for item in item]
-            foo[self.__jsonrpc_option_names__.get(name, name)] = item
-        return foo
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        # subclasses that override to_dict, and their subclasses, keep using the override
+        if "to_dict" not in cls.__dict__ and getattr(
+            cls.to_dict, "__compiled_to_dict__", False
+        ):
+            cls.to_dict = _lazy_to_dict  # type: ignore
+
+    @classmethod
+    def _compile_to_dict(cls) -> Callable[[Self], dict[str, Any]]:
+        names = cls.__jsonrpc_option_names__
+        lines = ["def to_dict(self):", "    data = {}"]
+
+        for name in cls.__slots__:
+            if name.startswith("__"):
+                continue
+            lines.extend(
+                (
+                    "    try:",
+                    f"        value = self.{name}",
+                    "    except AttributeError:",
+                    "        pass",
+                    "    else:",
+                    "        if isinstance(value, Base):",
+                    "            value = value.to_dict()",
+                    "        elif isinstance(value, list):",
+                    "            value = _convert_list(value)",
+                    f"        data[{names.get(name, name)!r}] = value",
+                )
+            )
+
+        lines.append("    return data")
+        return compile_function(
+            "to_dict", lines, {"Base": Base, "_convert_list": _convert_list}
+        )
+
+    to_dict = _lazy_to_dict
 
     @classmethod
     def from_dict(cls: type[Self], data: dict[str, Any]) -> Self:
@@ -31,5 +104,5 @@ class Base:
 
 
 class ToMessageBase(Base):
-    def to_message(self, id: int) -> bytes:
-        return (json.dumps(self.to_dict()) + "\r\n").encode()
+    def to_message(self, id: int, codec: JsonCodec | None = None) -> bytes:
+        return (codec or get_default_codec()).encode_message(self.to_dict())
@@ -1,51 +1,154 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+import time
 from asyncio.streams import StreamReader, StreamWriter
 from typing import TYPE_CHECKING, Any
 
-from .errors import JsonRPCException
-from .requests import Request
+from ..utils import MISSING
+from .admission import AdmissionController
+from .codec import get_default_codec
+from .errors import JsonRPCException, JsonRPCRequestTimeout
+from .metrics import LatencyHistogram
+from .protocol import (
+    CancelRequested,
+    ErrorReceived,
+    InvalidMessage,
+    JsonRPCProtocol,
+    NotificationReceived,
+    ProtocolEvent,
+    RequestReceived,
+    ResultReceived,
+)
 from .responses import BaseResponse, ErrorResponse
+from .writer import BatchedWriter
 
 LOG = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from ..plugin import Plugin
+    from .codec import JsonCodec
 
 __all__ = ("JsonRPCClient",)
 
 
 class JsonRPCClient:
     reader: StreamReader
-    writer: StreamWriter
+    output: BatchedWriter
 
-    def __init__(self, plugin: Plugin[Any]) -> None:
+    def __init__(
+        self,
+        plugin: Plugin[Any],
+        *,
+        codec: JsonCodec | None = None,
+        admission: AdmissionController | None = None,
+        request_timeout: float | None = 30,
+        write_high_water_mark: int = 1048576,
+        read_size: int = 2**16,
+        max_message_size: int | None = 2**24,
+    ) -> None:
         self.tasks: dict[int, asyncio.Task] = {}
         self.requests: dict[int, asyncio.Future[Any | ErrorResponse]] = {}
-        self._current_request_id = 1
+        self._request_stats: dict[str, LatencyHistogram] = {}
+        self.request_timeout = request_timeout
+        self.write_high_water_mark = write_high_water_mark
+        self.read_size = read_size
         self.plugin = plugin
+        self.codec: JsonCodec = codec or get_default_codec()
+        self.protocol = JsonRPCProtocol(
+            codec=self.codec, max_message_size=max_message_size
+        )
+        self.admission: AdmissionController = admission or AdmissionController()
+        if self.admission.on_shed is None:
+            self.admission.on_shed = self.send_cancelled
+
+    @property
+    def writer(self) -> StreamWriter:
+        """:class:`asyncio.StreamWriter`: The stream that messages to flow are written to. Setting this also replaces :attr:`output`."""
+        return self._writer
+
+    @writer.setter
+    def writer(self, writer: StreamWriter) -> None:
+        self._writer = writer
+        self.output = BatchedWriter(
+            writer,
+            high_water_mark=self.write_high_water_mark,
+            on_error=self._on_write_error,
+        )
+
+    def _on_write_error(self, error: Exception) -> None:
+        # the failed batch could have contained any of the pending requests, so none of them can expect a response
+        for rid, fut in list(self.requests.items()):
+            if not fut.done():
+                fut.set_exception(error)
+            self.requests.pop(rid, None)
+            self.protocol.forget_request(rid)
 
     @property
     def request_id(self) -> int:
-        self._current_request_id += 1
-        return self._current_request_id
+        return self.protocol.next_id()
+
+    @property
+    def pending_requests(self) -> int:
+        """:class:`int`: The amount of requests sent to flow that are still waiting for a response"""
+        return len(self.requests)
+
+    def request_stats(self) -> dict[str, LatencyHistogram]:
+        r"""Gets the latency histograms of the requests sent to flow, grouped by method.
+
+        Returns
+        -------
+        dict[:class:`str`, :class:`~flogin.jsonrpc.metrics.LatencyHistogram`]
+        """
 
-    @request_id.setter
-    def request_id(self, value: int) -> None:
-        self._current_request_id = value
+        return dict(self._request_stats)
+
+    def _get_request_stats(self, method: str) -> LatencyHistogram:
+        try:
+            return self._request_stats[method]
+        except KeyError:
+            stats = self._request_stats[method] = LatencyHistogram()
+            return stats
 
     async def request(
-        self, method: str, params: list[object] = []
+        self,
+        method: str,
+        params: list[object] = [],
+        *,
+        timeout: float | None = MISSING,
     ) -> Any | ErrorResponse:
-        fut: asyncio.Future[Any | ErrorResponse] = asyncio.Future()
-        rid = self.request_id
+        if timeout is MISSING:
+            timeout = self.request_timeout
+
+        fut: asyncio.Future[Any | ErrorResponse] = (
+            asyncio.get_running_loop().create_future()
+        )
+        rid, msg = self.protocol.send_request(method, params)
         self.requests[rid] = fut
-        msg = Request(method, rid, params).to_message(rid)
-        await self.write(msg, drain=False)
-        return await fut
+        stats = self._get_request_stats(method)
+        start = time.perf_counter()
+
+        try:
+            await self.write(msg)
+            async with asyncio.timeout(timeout):
+                result = await fut
+        except TimeoutError:
+            if timeout is None:
+                raise
+            stats.timeouts += 1
+            raise JsonRPCRequestTimeout(method, rid, timeout) from None
+        finally:
+            self.requests.pop(rid, None)
+            self.protocol.forget_request(rid)
+
+        stats.observe(time.perf_counter() - start)
+        return result
+
+    async def send_cancelled(self, id: int) -> None:
+        await self.write(
+            self.protocol.send_response(id, ErrorResponse.request_cancelled())
+        )
 
     async def handle_cancellation(self, id: int) -> None:
         if id in self.tasks:
@@ -55,6 +158,9 @@ class JsonRPCClient:
                 LOG.info(f"Successfully cancelled task with id {id!r}")
             else:
                 LOG.exception(f"Failed to cancel task with id of {id!r}, task={task!r}")
+        elif self.admission.cancel(id):
+            LOG.info(f"Successfully cancelled queued request with id {id!r}")
+            await self.send_cancelled(id)
         else:
             LOG.exception(
                 f"Failed to cancel task with id of {id!r}, could not find task."
@@ -70,8 +176,8 @@ class JsonRPCClient:
             except asyncio.InvalidStateError:
                 pass
         else:
-            LOG.exception(
-                f"Result from unknown request given. ID: {rid!r}, result={result!r}"
+            LOG.warning(
+                f"Result from unknown or timed out request given. ID: {rid!r}, result={result!r}"
             )
 
     async def handle_error(self, id: int, error: ErrorResponse) -> None:
@@ -89,14 +195,12 @@ class JsonRPCClient:
                 exc_info=JsonRPCException("Unknown notificaton method received"),
             )
 
-    async def handle_request(self, request: dict[str, Any]) -> None:
-        method: str = request["method"]
-        params: list[Any] = request["params"]
+    async def handle_request(self, request: RequestReceived) -> None:
+        method = request.method
+        params = request.params
         task = None
         error_handler = "on_error"
 
-        self.request_id = request["id"]
-
         if method.startswith("flogin.action"):
             slug = method.removeprefix("flogin.action.")
             result = self.plugin._results.get(slug)
@@ -113,57 +217,111 @@ class JsonRPCClient:
             if not task:
                 return
 
-        self.tasks[request["id"]] = task
-        result = await task
+        self.tasks[request.id] = task
+        try:
+            result = await task
+        finally:
+            self.tasks.pop(request.id, None)
 
-        if isinstance(result, BaseResponse):
-            return await self.write(result.to_message(id=request["id"]))
-        else:
-            return await self.write(
-                ErrorResponse.internal_error().to_message(id=request["id"])
+        if not isinstance(result, BaseResponse):
+            result = ErrorResponse.internal_error()
+
+        try:
+            msg = self.protocol.send_response(request.id, result)
+        except Exception as e:
+            LOG.exception(f"Failed to encode response to {method!r}", exc_info=e)
+            msg = self.protocol.send_response(
+                request.id, ErrorResponse.internal_error(e)
             )
+        return await self.write(msg)
 
-    async def process_input(self, line: str):
+    async def process_input(self, line: bytes):
         LOG.debug(f"Processing {line!r}")
-        message = json.loads(line)
-
-        if "id" not in message:
-            LOG.debug(f"Received notification: {message!r}")
-            await self.handle_notification(message["method"], message["params"])
-        elif "method" in message:
-            LOG.debug(f"Received request: {message!r}")
-            await self.handle_request(message)
-        elif "result" in message:
-            LOG.debug(f"Received result: {message!r}")
-            await self.handle_result(message)
-        elif "error" in message:
-            LOG.exception(f"Received error: {message!r}")
-            await self.handle_error(
-                message["id"], ErrorResponse.from_dict(message["error"])
+        await self.handle_event(self.protocol.receive_message(line))
+
+    def submit_input(self, line: bytes) -> None:
+        r"""Parses a single message and schedules it to be handled."""
+
+        self.submit_event(self.protocol.receive_message(line))
+
+    def submit_event(self, event: ProtocolEvent) -> None:
+        r"""Schedules an event from :attr:`protocol` to be handled. Requests go through :attr:`admission`, while notifications and results are always handled right away."""
+
+        if isinstance(event, RequestReceived):
+            self.admission.submit(
+                event.method, event.id, lambda: self.handle_event(event)
             )
+        elif isinstance(event, InvalidMessage):
+            self.handle_invalid_message(event)
+        else:
+            self.admission.spawn(self.handle_event(event))
+
+    def handle_invalid_message(self, event: InvalidMessage) -> None:
+        error = event.error or JsonRPCException("Unknown message type received")
+        LOG.exception(f"Failed to parse message {event.data!r}", exc_info=error)
+
+        # if it was a response to one of our requests, don't leave the caller waiting for the timeout
+        if event.id is not None and event.id in self.requests:
+            fut = self.requests.pop(event.id)
+            if not fut.done():
+                fut.set_exception(error)
+
+    async def handle_event(self, event: ProtocolEvent) -> None:
+        if isinstance(event, RequestReceived):
+            LOG.debug(f"Received request: {event!r}")
+            await self.handle_request(event)
+        elif isinstance(event, CancelRequested):
+            await self.handle_cancellation(event.id)
+        elif isinstance(event, NotificationReceived):
+            LOG.debug(f"Received notification: {event!r}")
+            await self.handle_notification(event.method, event.params)
+        elif isinstance(event, ResultReceived):
+            LOG.debug(f"Received result: {event!r}")
+            await self.handle_result(event.message)  # type: ignore
+        elif isinstance(event, ErrorReceived):
+            LOG.exception(f"Received error: {event!r}")
+            await self.handle_error(event.id, event.error)
+        elif isinstance(event, InvalidMessage):
+            self.handle_invalid_message(event)
         else:
             LOG.exception(
                 f"Unknown message type received",
                 exc_info=JsonRPCException("Unknown message type received"),
             )
 
+    async def process_message(self, message: dict[str, Any]):
+        await self.handle_event(self.protocol.parse_message(message))
+
     async def start_listening(self, reader: StreamReader, writer: StreamWriter):
+        r"""|coro|
+
+        Reads from ``reader`` until it reaches EOF, feeding the data to :attr:`protocol` and scheduling the events that it produces.
+
+        Parameters
+        ----------
+        reader: :class:`asyncio.StreamReader`
+            The stream to read flow's messages from
+        writer: :class:`asyncio.StreamWriter`
+            The stream to write messages to flow with
+        """
+
         self.reader = reader
         self.writer = writer
 
         stream_log = logging.getLogger("flogin.stream_reader")
 
         while 1:
-            async for line in reader:
-                stream_log.info(f"Received line: {line!r} of type {type(line)!r}")
-                line = line.decode("utf-8")
-                if line == "":
-                    continue
+            data = await reader.read(self.read_size)
+            if not data:
+                stream_log.info("Reached EOF, stopping")
+                return
 
-                asyncio.create_task(self.process_input(line))
+            stream_log.info(f"Received data: {data!r}")
+            for event in self.protocol.receive_data(data):
+                self.submit_event(event)
 
-    async def write(self, msg: bytes, drain: bool = True) -> None:
+    async def write(self, msg: bytes, drain: bool = False) -> None:
         LOG.debug(f"Sending: {msg!r}")
-        self.writer.write(msg)
+        await self.output.write(msg)
         if drain:
-            await self.writer.drain()
+            await self.output.drain()
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+__all__ = (
+    "JsonCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "get_default_codec",
+)
+
+
+class JsonCodec:
+    r"""The codec that the jsonrpc client uses to encode and decode messages. This implementation uses the builtin :mod:`json` module.
+
+    Codecs work on :class:`bytes` directly, so messages never have to be decoded to or encoded from :class:`str`.
+
+    Subclass this and override :func:`~flogin.jsonrpc.codec.JsonCodec.dumps` and :func:`~flogin.jsonrpc.codec.JsonCodec.loads` to use your own json library.
+
+    Attributes
+    ----------
+    name: :class:`str`
+        The name of the codec
+    """
+
+    name: str = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        r"""Encodes an object into json.
+
+        Parameters
+        ----------
+        obj: Any
+            The object to encode
+
+        Returns
+        -------
+        :class:`bytes`
+        """
+
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes | bytearray | memoryview | str) -> Any:
+        r"""Decodes json into an object.
+
+        Parameters
+        ----------
+        data: :class:`bytes` | :class:`bytearray` | :class:`memoryview` | :class:`str`
+            The json to decode
+
+        Returns
+        -------
+        Any
+        """
+
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def encode_message(self, obj: Any) -> bytes:
+        r"""Encodes an object into a full message that can be written to flow, including the line terminator.
+
+        Parameters
+        ----------
+        obj: Any
+            The object to encode
+
+        Returns
+        -------
+        :class:`bytes`
+        """
+
+        return self.dumps(obj) + b"\r\n"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name=}>"
+
+
+class OrjsonCodec(JsonCodec):
+    r"""A :class:`~flogin.jsonrpc.codec.JsonCodec` that uses `orjson <https://pypi.org/project/orjson>`_.
+
+    Non-string dict keys are allowed, and objects that orjson can not encode (such as integers larger than 64 bits) are encoded with the builtin :mod:`json` module instead, so this codec accepts everything that :class:`~flogin.jsonrpc.codec.JsonCodec` does.
+
+    Raises
+    ------
+    :class:`ModuleNotFoundError`
+        orjson is not installed
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._dumps(obj, option=self._option)
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, data: bytes | bytearray | memoryview | str) -> Any:
+        return self._loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    r"""A :class:`~flogin.jsonrpc.codec.JsonCodec` that uses `msgspec <https://pypi.org/project/msgspec>`_.
+
+    Objects that msgspec can not encode are encoded with the builtin :mod:`json` module instead, so this codec accepts everything that :class:`~flogin.jsonrpc.codec.JsonCodec` does.
+
+    Raises
+    ------
+    :class:`ModuleNotFoundError`
+        msgspec is not installed
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._encode_errors = (
+            TypeError,
+            ValueError,
+            OverflowError,
+            msgspec.EncodeError,
+        )
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._encoder.encode(obj)
+        except self._encode_errors:
+            return super().dumps(obj)
+
+    def loads(self, data: bytes | bytearray | memoryview | str) -> Any:
+        return self._decoder.decode(data)
+
+
+_default_codec: JsonCodec | None = None
+
+
+def get_default_codec() -> JsonCodec:
+    r"""Gets the default codec. orjson is preferred, followed by msgspec, and the builtin :mod:`json` module is used if neither are installed.
+
+    Returns
+    -------
+    :class:`~flogin.jsonrpc.codec.JsonCodec`
+    """
+
+    global _default_codec
+
+    if _default_codec is None:
+        for codec_cls in (OrjsonCodec, MsgspecCodec):
+            try:
+                _default_codec = codec_cls()
+            except ImportError:
+                continue
+            break
+        else:
+            _default_codec = JsonCodec()
+
+    return _default_codec
@@ -1,4 +1,9 @@
-__all__ = ("JsonRPCException", "JsonRPCVersionMismatch")
+__all__ = (
+    "JsonRPCException",
+    "JsonRPCVersionMismatch",
+    "JsonRPCRequestTimeout",
+    "JsonRPCMessageTooLarge",
+)
 
 
 class JsonRPCException(Exception):
@@ -22,3 +27,39 @@ class JsonRPCVersionMismatch(JsonRPCException):
         )
         self.expected = expected
         self.received = received
+
+
+class JsonRPCRequestTimeout(JsonRPCException, TimeoutError):
+    r"""This is raised when flow does not respond to a request in time
+
+    Attributes
+    --------
+    method: :class:`str`
+        The method of the request
+    id: :class:`int`
+        The id of the request
+    timeout: :class:`float`
+        How long flogin waited for a response, in seconds
+    """
+
+    def __init__(self, method: str, id: int, timeout: float) -> None:
+        super().__init__(
+            f"Flow did not respond to the {method!r} request (id={id}) within {timeout} seconds."
+        )
+        self.method = method
+        self.id = id
+        self.timeout = timeout
+
+
+class JsonRPCMessageTooLarge(JsonRPCException):
+    r"""This is used when a message from flow is larger than the max message size, and gets discarded
+
+    Attributes
+    --------
+    limit: :class:`int`
+        The max message size, in bytes
+    """
+
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"Received a message larger than {limit} bytes.")
+        self.limit = limit
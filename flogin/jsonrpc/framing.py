@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+
+from .errors import JsonRPCMessageTooLarge
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ("LineFramer",)
+
+
+class LineFramer:
+    r"""Splits the newline delimited stream that flow sends into complete messages.
+
+    Each received chunk is scanned for newlines exactly once, and the chunks of a message that spans several reads are kept in a list and joined a single time once the message is complete, so large messages never get copied over and over. A message that arrives in a single chunk is returned as a :class:`memoryview` of that chunk without being copied at all.
+
+    .. NOTE::
+        Do not initialize this class yourself, instead use the ``max_message_size`` option of :class:`~flogin.plugin.Plugin`, and the :attr:`~flogin.jsonrpc.protocol.JsonRPCProtocol.framer` attribute to get the instance.
+
+    Attributes
+    ----------
+    max_size: :class:`int` | None
+        The max size of a single message in bytes, not counting the line terminator. ``None`` means unlimited.
+    """
+
+    __slots__ = ("max_size", "_chunks", "_size", "_discarding")
+
+    def __init__(self, *, max_size: int | None = 2**24) -> None:
+        self.max_size = max_size
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self._discarding = False
+
+    @property
+    def buffered(self) -> int:
+        """:class:`int`: The amount of bytes of incomplete messages that are being held"""
+        return self._size
+
+    def feed(self, data: bytes) -> list[bytes | memoryview | JsonRPCMessageTooLarge]:
+        r"""Feeds a chunk of data into the framer.
+
+        Parameters
+        ----------
+        data: :class:`bytes`
+            The data, which does not have to line up with message boundaries
+
+        Returns
+        -------
+        list[:class:`bytes` | :class:`memoryview` | :class:`~flogin.jsonrpc.errors.JsonRPCMessageTooLarge`]
+            Every message that was completed by this data, in order. Blank lines are skipped, and messages that were larger than :attr:`max_size` are replaced by an instance of :class:`~flogin.jsonrpc.errors.JsonRPCMessageTooLarge`.
+        """
+
+        frames: list[bytes | memoryview | JsonRPCMessageTooLarge] = []
+        limit = self.max_size
+        view = memoryview(data)
+        start = 0
+
+        while (idx := data.find(b"\n", start)) != -1:
+            size = self._size + idx - start
+
+            if self._discarding:
+                self._discarding = False
+            elif limit is not None and size > limit:
+                frames.append(JsonRPCMessageTooLarge(limit))
+            else:
+                if self._chunks:
+                    self._chunks.append(data[start:idx])
+                    frame = b"".join(self._chunks)
+                else:
+                    frame = view[start:idx]
+
+                # only short frames can be blank lines, so larger ones are never copied to check
+                if size > 8 or bytes(frame).strip():
+                    frames.append(frame)
+
+            self._chunks.clear()
+            self._size = 0
+            start = idx + 1
+
+        if start < len(data) and not self._discarding:
+            self._size += len(data) - start
+
+            if limit is not None and self._size > limit:
+                LOG.warning(f"Discarding a message larger than {limit} bytes")
+                frames.append(JsonRPCMessageTooLarge(limit))
+                self._discarding = True
+                self._chunks.clear()
+                self._size = 0
+            else:
+                self._chunks.append(data[start:])
+
+        return frames
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} max_size={self.max_size!r} buffered={self._size!r}>"
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+
+__all__ = ("LatencyHistogram",)
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+class LatencyHistogram:
+    r"""A fixed-bucket histogram of how long requests to flow took to get a response.
+
+    .. NOTE::
+        This is not intended to be a class that you create yourself, use :func:`~flogin.jsonrpc.client.JsonRPCClient.request_stats` instead.
+
+    Attributes
+    ----------
+    buckets: tuple[:class:`float`, ...]
+        The upper bounds of each bucket, in seconds. An extra bucket for anything larger than the last bound is always kept.
+    counts: list[:class:`int`]
+        The amount of observations in each bucket
+    count: :class:`int`
+        The total amount of observations
+    total: :class:`float`
+        The sum of all observations, in seconds
+    max: :class:`float`
+        The largest observation, in seconds
+    timeouts: :class:`int`
+        The amount of requests that timed out, which are not included in the observations
+    """
+
+    __slots__ = "buckets", "counts", "count", "total", "max", "timeouts"
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float) -> None:
+        r"""Records a new observation.
+
+        Parameters
+        ----------
+        seconds: :class:`float`
+            How long the request took
+        """
+
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        """:class:`float`: The average observation, in seconds"""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        r"""Estimates a percentile using the upper bound of the bucket it lands in.
+
+        Parameters
+        ----------
+        percent: :class:`float`
+            The percentile to get, from 0-100
+
+        Returns
+        -------
+        :class:`float`
+            The estimated value in seconds. If it lands in the overflow bucket, :attr:`max` is returned.
+        """
+
+        if not self.count:
+            return 0.0
+
+        target = self.count * percent / 100
+        seen = 0
+        for idx, amount in enumerate(self.counts):
+            seen += amount
+            if seen >= target and amount:
+                if idx < len(self.buckets):
+                    return min(self.buckets[idx], self.max)
+                return self.max
+        return self.max
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.count=} {self.mean=} {self.max=} {self.timeouts=}>"
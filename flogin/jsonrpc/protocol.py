@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import itertools
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .codec import get_default_codec
+from .errors import JsonRPCMessageTooLarge
+from .framing import LineFramer
+from .requests import Request
+from .responses import ErrorResponse
+
+if TYPE_CHECKING:
+    from .codec import JsonCodec
+    from .responses import BaseResponse
+
+LOG = logging.getLogger(__name__)
+
+__all__ = (
+    "JsonRPCProtocol",
+    "ProtocolEvent",
+    "RequestReceived",
+    "NotificationReceived",
+    "CancelRequested",
+    "ResultReceived",
+    "ErrorReceived",
+    "InvalidMessage",
+)
+
+
+class ProtocolEvent:
+    r"""The base class for events produced by :class:`~flogin.jsonrpc.protocol.JsonRPCProtocol`.
+
+    Attributes
+    ----------
+    message: dict[:class:`str`, Any] | None
+        The decoded message that produced this event
+    """
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: dict[str, Any] | None) -> None:
+        self.message = message
+
+    def __repr__(self) -> str:
+        args = []
+        for cls in type(self).__mro__:
+            for item in getattr(cls, "__slots__", ()):
+                if item != "message":
+                    args.append(f"{item}={getattr(self, item)!r}")
+        return f"<{self.__class__.__name__} {' '.join(args)}>"
+
+
+class RequestReceived(ProtocolEvent):
+    r"""Flow sent a request that needs a response.
+
+    Attributes
+    ----------
+    id: :class:`int`
+        The id of the request
+    method: :class:`str`
+        The method of the request
+    params: list[Any]
+        The params of the request
+    """
+
+    __slots__ = "id", "method", "params"
+
+    def __init__(self, message: dict[str, Any]) -> None:
+        super().__init__(message)
+        self.id: int = message["id"]
+        self.method: str = message["method"]
+        self.params: list[Any] = message.get("params") or []
+
+
+class NotificationReceived(ProtocolEvent):
+    r"""Flow sent a notification, which does not get a response.
+
+    Attributes
+    ----------
+    method: :class:`str`
+        The method of the notification
+    params: Any
+        The params of the notification
+    """
+
+    __slots__ = "method", "params"
+
+    def __init__(self, message: dict[str, Any]) -> None:
+        super().__init__(message)
+        self.method: str = message["method"]
+        self.params: Any = message.get("params")
+
+
+class CancelRequested(ProtocolEvent):
+    r"""Flow asked for one of its requests to be cancelled.
+
+    Attributes
+    ----------
+    id: :class:`int`
+        The id of the request that should be cancelled
+    """
+
+    __slots__ = ("id",)
+
+    def __init__(self, message: dict[str, Any]) -> None:
+        super().__init__(message)
+        self.id: int = message["params"]["id"]
+
+
+class ResultReceived(ProtocolEvent):
+    r"""Flow responded to one of our requests.
+
+    Attributes
+    ----------
+    id: :class:`int`
+        The id of the request
+    method: :class:`str` | None
+        The method of the request, or ``None`` if the id is unknown
+    result: Any
+        The result that flow gave
+    """
+
+    __slots__ = "id", "method", "result"
+
+    def __init__(self, message: dict[str, Any], method: str | None) -> None:
+        super().__init__(message)
+        self.id: int = message["id"]
+        self.method = method
+        self.result: Any = message["result"]
+
+
+class ErrorReceived(ProtocolEvent):
+    r"""Flow responded to one of our requests with an error.
+
+    Attributes
+    ----------
+    id: :class:`int`
+        The id of the request
+    method: :class:`str` | None
+        The method of the request, or ``None`` if the id is unknown
+    error: :class:`~flogin.jsonrpc.responses.ErrorResponse`
+        The error that flow gave
+    """
+
+    __slots__ = "id", "method", "error"
+
+    def __init__(self, message: dict[str, Any], method: str | None) -> None:
+        super().__init__(message)
+        self.id: int = message["id"]
+        self.method = method
+        self.error = ErrorResponse.from_dict(message["error"])
+
+
+class InvalidMessage(ProtocolEvent):
+    r"""A message could not be decoded, or is not a valid jsonrpc message.
+
+    Attributes
+    ----------
+    data: :class:`bytes`
+        The raw message
+    error: :class:`Exception` | None
+        The error that occured while decoding the message, if any
+    id: :class:`int` | None
+        If the message is a response to one of our requests, the id of that request
+    """
+
+    __slots__ = "data", "error", "id"
+
+    def __init__(
+        self,
+        data: bytes,
+        error: Exception | None = None,
+        message: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.data = data
+        self.error = error
+        self.id: int | None = None
+        if isinstance(message, dict) and "method" not in message:
+            self.id = message.get("id")
+
+
+class JsonRPCProtocol:
+    r"""A sans-io implementation of the jsonrpc protocol that flow uses.
+
+    This class does not do any io itself. Bytes received from flow are passed to :func:`receive_data`, which returns the events that they produced, and the methods that send messages return the bytes that should be written to flow. This makes it possible to drive the protocol over any transport, or without one at all.
+
+    Parameters
+    ----------
+    codec: Optional[:class:`~flogin.jsonrpc.codec.JsonCodec`]
+        The codec to use. Defaults to :func:`~flogin.jsonrpc.codec.get_default_codec`
+    max_message_size: Optional[:class:`int`]
+        The max size of a single message in bytes. Larger messages are discarded, and produce an :class:`~flogin.jsonrpc.protocol.InvalidMessage` event. ``None`` means unlimited. Defaults to 16 MiB
+
+    Attributes
+    ----------
+    codec: :class:`~flogin.jsonrpc.codec.JsonCodec`
+        The codec that is used to encode and decode messages
+    framer: :class:`~flogin.jsonrpc.framing.LineFramer`
+        The framer that splits received data into messages
+    pending: dict[:class:`int`, :class:`str`]
+        The ids and methods of the requests that have been sent, but have not gotten a response yet
+    """
+
+    def __init__(
+        self, *, codec: JsonCodec | None = None, max_message_size: int | None = 2**24
+    ) -> None:
+        self.codec: JsonCodec = codec or get_default_codec()
+        self.framer = LineFramer(max_size=max_message_size)
+        self.pending: dict[int, str] = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def max_message_size(self) -> int | None:
+        """:class:`int` | None: The max size of a single message in bytes. ``None`` means unlimited."""
+        return self.framer.max_size
+
+    @max_message_size.setter
+    def max_message_size(self, value: int | None) -> None:
+        self.framer.max_size = value
+
+    def next_id(self) -> int:
+        r"""Reserves the next request id.
+
+        Returns
+        -------
+        :class:`int`
+        """
+
+        return next(self._ids)
+
+    def receive_data(self, data: bytes) -> list[ProtocolEvent]:
+        r"""Feeds bytes received from flow into the protocol.
+
+        Parameters
+        ----------
+        data: :class:`bytes`
+            The bytes, which do not have to line up with message boundaries
+
+        Returns
+        -------
+        list[:class:`~flogin.jsonrpc.protocol.ProtocolEvent`]
+            The events produced by every message that was completed by this data
+        """
+
+        events: list[ProtocolEvent] = []
+
+        for frame in self.framer.feed(data):
+            if isinstance(frame, JsonRPCMessageTooLarge):
+                events.append(InvalidMessage(b"", frame))
+            else:
+                events.append(self.receive_message(frame))
+
+        return events
+
+    def receive_message(self, data: bytes | memoryview) -> ProtocolEvent:
+        r"""Parses a single, complete message.
+
+        Parameters
+        ----------
+        data: :class:`bytes` | :class:`memoryview`
+            The message, without any framing
+
+        Returns
+        -------
+        :class:`~flogin.jsonrpc.protocol.ProtocolEvent`
+        """
+
+        try:
+            message = self.codec.loads(data)
+        except Exception as e:
+            return InvalidMessage(bytes(data), e)
+
+        if not isinstance(message, dict):
+            return InvalidMessage(bytes(data))
+
+        event = self.parse_message(message)
+        if isinstance(event, InvalidMessage):
+            event.data = bytes(data)
+        return event
+
+    def parse_message(self, message: dict[str, Any]) -> ProtocolEvent:
+        r"""Converts a decoded message into an event.
+
+        Parameters
+        ----------
+        message: dict[:class:`str`, Any]
+            The decoded message
+
+        Returns
+        -------
+        :class:`~flogin.jsonrpc.protocol.ProtocolEvent`
+        """
+
+        try:
+            return self._parse_message(message)
+        except (KeyError, TypeError) as e:
+            if "method" not in message:
+                self.pending.pop(message.get("id"), None)  # type: ignore
+            return InvalidMessage(b"", e, message)
+
+    def _parse_message(self, message: dict[str, Any]) -> ProtocolEvent:
+        if "method" in message:
+            if "id" in message:
+                return RequestReceived(message)
+            if message["method"] == "$/cancelRequest":
+                return CancelRequested(message)
+            return NotificationReceived(message)
+        if "result" in message:
+            return ResultReceived(message, self.pending.pop(message["id"], None))
+        if "error" in message:
+            return ErrorReceived(message, self.pending.pop(message["id"], None))
+        return InvalidMessage(b"", message=message)
+
+    def send_request(
+        self, method: str, params: list[Any] | None = None
+    ) -> tuple[int, bytes]:
+        r"""Creates a request to send to flow.
+
+        Parameters
+        ----------
+        method: :class:`str`
+            The method
+        params: Optional[list[Any]]
+            The params
+
+        Returns
+        -------
+        tuple[:class:`int`, :class:`bytes`]
+            The id that was given to the request, and the bytes to write
+        """
+
+        rid = self.next_id()
+        self.pending[rid] = method
+        return rid, Request(method, rid, params or []).to_message(rid, self.codec)
+
+    def forget_request(self, id: int) -> None:
+        r"""Stops tracking a request, for example after it timed out.
+
+        Parameters
+        ----------
+        id: :class:`int`
+            The id of the request
+        """
+
+        self.pending.pop(id, None)
+
+    def send_response(self, id: int, response: BaseResponse) -> bytes:
+        r"""Creates a response to one of flow's requests.
+
+        Parameters
+        ----------
+        id: :class:`int`
+            The id of flow's request
+        response: :class:`~flogin.jsonrpc.responses.BaseResponse`
+            The response
+
+        Returns
+        -------
+        :class:`bytes`
+            The bytes to write
+        """
+
+        return response.to_message(id, self.codec)
+
+    def send_cancel(self, id: int) -> bytes:
+        r"""Creates a notification that asks flow to cancel one of our requests.
+
+        Parameters
+        ----------
+        id: :class:`int`
+            The id of the request
+
+        Returns
+        -------
+        :class:`bytes`
+            The bytes to write
+        """
+
+        self.pending.pop(id, None)
+        return self.codec.encode_message(
+            {"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": id}}
+        )
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import logging
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Iterable, Literal, Mapping, MutableMapping
+
+if TYPE_CHECKING:
+    from .results import Result
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ("ResultRegistry", "RegistryStats")
+
+RetentionMode = Literal["generations", "lru", "weak"]
+
+
+class RegistryStats:
+    r"""A snapshot of the statistics of a :class:`~flogin.jsonrpc.registry.ResultRegistry`.
+
+    .. NOTE::
+        This is not intended to be a class that you create yourself, use :func:`~flogin.jsonrpc.registry.ResultRegistry.stats` instead.
+
+    Attributes
+    ----------
+    size: :class:`int`
+        The amount of results that are currently registered
+    generations: :class:`int`
+        The amount of query generations that currently have results registered
+    registered: :class:`int`
+        The total amount of times a result has been registered
+    evicted: :class:`int`
+        The total amount of results that have been removed to stay within the retention limits
+    hits: :class:`int`
+        The total amount of lookups that found a result
+    misses: :class:`int`
+        The total amount of lookups that did not find a result
+    """
+
+    __slots__ = "size", "generations", "registered", "evicted", "hits", "misses"
+
+    def __init__(
+        self,
+        *,
+        size: int = 0,
+        generations: int = 0,
+        registered: int = 0,
+        evicted: int = 0,
+        hits: int = 0,
+        misses: int = 0,
+    ) -> None:
+        self.size = size
+        self.generations = generations
+        self.registered = registered
+        self.evicted = evicted
+        self.hits = hits
+        self.misses = misses
+
+    def __repr__(self) -> str:
+        args = " ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"<{self.__class__.__name__} {args}>"
+
+
+class ResultRegistry:
+    r"""Keeps track of the results that have been sent to flow, so that their callbacks and context menus can be found when flow asks for them.
+
+    Every result is registered under the query generation that produced it, and old results are removed depending on the retention mode:
+
+    - ``"generations"``: results are kept for the last ``max_generations`` queries
+    - ``"lru"``: up to ``max_size`` results are kept, and the least recently used ones are removed first
+    - ``"weak"``: results are only kept while something else, such as your plugin, holds a reference to them
+
+    .. NOTE::
+        Do not initialize this class yourself, instead use the ``result_retention``, ``max_result_generations`` and ``max_results`` options of :class:`~flogin.plugin.Plugin`, and :attr:`~flogin.plugin.Plugin.result_registry` to get the instance.
+
+    Attributes
+    ----------
+    retention: Literal["generations", "lru", "weak"]
+        The retention mode
+    max_generations: :class:`int`
+        The amount of query generations to keep results for, when using the ``"generations"`` retention mode
+    max_size: :class:`int`
+        The max amount of results to keep, when using the ``"lru"`` retention mode
+    generation: :class:`int`
+        The current query generation
+    """
+
+    def __init__(
+        self,
+        *,
+        retention: RetentionMode = "generations",
+        max_generations: int = 5,
+        max_size: int = 2048,
+    ) -> None:
+        if retention not in ("generations", "lru", "weak"):
+            raise ValueError(
+                f"retention must be 'generations', 'lru' or 'weak', not {retention!r}"
+            )
+        if max_generations < 1:
+            raise ValueError("max_generations must be at least 1")
+
+        self.retention = retention
+        self.max_generations = max_generations
+        self.max_size = max_size
+        self.generation = 0
+        self._entries: MutableMapping[str, Result] = (
+            weakref.WeakValueDictionary() if retention == "weak" else OrderedDict()
+        )
+        self._generations: OrderedDict[int, set[str]] = OrderedDict()
+        self._slug_generations: dict[str, int] = {}
+        self._registered = 0
+        self._evicted = 0
+        self._hits = 0
+        self._misses = 0
+
+    def new_generation(self) -> int:
+        r"""Starts a new query generation. With the ``"generations"`` retention mode, results from generations that are now too old are removed.
+
+        Returns
+        -------
+        :class:`int`
+            The new generation
+        """
+
+        self.generation += 1
+        if self.retention == "generations":
+            self._generations[self.generation] = set()
+            while len(self._generations) > self.max_generations:
+                _, slugs = self._generations.popitem(last=False)
+                for slug in slugs:
+                    del self._entries[slug]
+                    del self._slug_generations[slug]
+                self._evicted += len(slugs)
+        return self.generation
+
+    def add(self, result: Result) -> None:
+        r"""Registers a result under the current generation. If a result with the same slug is already registered, it is replaced and moved to the current generation.
+
+        Parameters
+        ----------
+        result: :class:`~flogin.jsonrpc.results.Result`
+            The result
+        """
+
+        slug = result.slug
+        self._registered += 1
+        self._entries[slug] = result
+
+        if self.retention == "generations":
+            old = self._slug_generations.get(slug)
+            if old == self.generation:
+                return
+            if old is not None:
+                self._generations[old].discard(slug)
+            self._slug_generations[slug] = self.generation
+            self._generations.setdefault(self.generation, set()).add(slug)
+        elif self.retention == "lru":
+            entries: OrderedDict[str, Result] = self._entries  # type: ignore
+            entries.move_to_end(slug)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+                self._evicted += 1
+
+    def update(self, results: Mapping[str, Result] | Iterable[Result]) -> None:
+        r"""Registers several results at once.
+
+        Parameters
+        ----------
+        results: Mapping[:class:`str`, :class:`~flogin.jsonrpc.results.Result`] | Iterable[:class:`~flogin.jsonrpc.results.Result`]
+            The results, or a mapping of slugs to results
+        """
+
+        if isinstance(results, Mapping):
+            results = results.values()
+        for result in results:
+            self.add(result)
+
+    def get(self, slug: str, default: Any = None) -> Result | Any:
+        r"""Gets a registered result by its slug.
+
+        Parameters
+        ----------
+        slug: :class:`str`
+            The slug of the result
+        default: Any
+            What to return if the result is not registered. Defaults to ``None``
+
+        Returns
+        -------
+        :class:`~flogin.jsonrpc.results.Result` | Any
+        """
+
+        result = self._entries.get(slug)
+        if result is None:
+            self._misses += 1
+            return default
+
+        self._hits += 1
+        if self.retention == "lru":
+            self._entries.move_to_end(slug)  # type: ignore
+        return result
+
+    def remove(self, slug: str) -> Result | None:
+        r"""Removes a result from the registry.
+
+        Parameters
+        ----------
+        slug: :class:`str`
+            The slug of the result
+
+        Returns
+        -------
+        :class:`~flogin.jsonrpc.results.Result` | None
+            The result that was removed, if it was registered
+        """
+
+        result = self._entries.pop(slug, None)
+        generation = self._slug_generations.pop(slug, None)
+        if generation is not None:
+            self._generations[generation].discard(slug)
+        return result
+
+    def clear(self) -> None:
+        r"""Removes every registered result."""
+
+        self._entries.clear()
+        self._slug_generations.clear()
+        for slugs in self._generations.values():
+            slugs.clear()
+
+    def stats(self) -> RegistryStats:
+        r"""Gets a snapshot of the registry's statistics.
+
+        Returns
+        -------
+        :class:`~flogin.jsonrpc.registry.RegistryStats`
+        """
+
+        return RegistryStats(
+            size=len(self._entries),
+            generations=sum(1 for slugs in self._generations.values() if slugs),
+            registered=self._registered,
+            evicted=self._evicted,
+            hits=self._hits,
+            misses=self._misses,
+        )
+
+    def __setitem__(self, slug: str, result: Result) -> None:
+        if slug != result.slug:
+            raise ValueError(f"Slug {slug!r} does not match the result's slug")
+        self.add(result)
+
+    def __getitem__(self, slug: str) -> Result:
+        result = self.get(slug)
+        if result is None:
+            raise KeyError(slug)
+        return result
+
+    def __delitem__(self, slug: str) -> None:
+        if self.remove(slug) is None:
+            raise KeyError(slug)
+
+    def __contains__(self, slug: object) -> bool:
+        return slug in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} retention={self.retention!r} generation={self.generation!r} size={len(self)!r}>"
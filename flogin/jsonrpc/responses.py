@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 from typing import TYPE_CHECKING, Any
 
 from ..utils import MISSING
 from .base_object import ToMessageBase
+from .codec import JsonCodec, get_default_codec
 
 if TYPE_CHECKING:
     from .results import Result
@@ -23,17 +23,14 @@ class BaseResponse(ToMessageBase):
         This class is NOT to be used as is. Use one of it's subclasses instead.
     """
 
-    def to_message(self, id: int) -> bytes:
-        return (
-            json.dumps(
-                {
-                    "jsonrpc": "2.0",
-                    "result": self.to_dict(),
-                    "id": id,
-                }
-            )
-            + "\r\n"
-        ).encode()
+    def to_message(self, id: int, codec: JsonCodec | None = None) -> bytes:
+        return (codec or get_default_codec()).encode_message(
+            {
+                "jsonrpc": "2.0",
+                "result": self.to_dict(),
+                "id": id,
+            }
+        )
 
 
 class ErrorResponse(BaseResponse):
@@ -64,12 +61,16 @@ class ErrorResponse(BaseResponse):
 
     @classmethod
     def from_dict(cls: type[ErrorResponse], data: dict[str, Any]) -> ErrorResponse:
-        return cls(code=data["code"], message=data["message"], data=data["data"])
+        return cls(code=data["code"], message=data["message"], data=data.get("data"))
 
     @classmethod
     def internal_error(cls: type[ErrorResponse], data: Any = None) -> ErrorResponse:
         return cls(code=-32603, message="Internal error", data=data)
 
+    @classmethod
+    def request_cancelled(cls: type[ErrorResponse], data: Any = None) -> ErrorResponse:
+        return cls(code=-32800, message="Request cancelled", data=data)
+
 
 class QueryResponse(BaseResponse):
     r"""This response represents the response from search handler's callbacks and context menus. See the :ref:`search handler section <search_handlers>` for more information about using search handlers.
@@ -101,6 +102,46 @@ class QueryResponse(BaseResponse):
         self.settings_changes = settings_changes or {}
         self.debug_message = debug_message or ""
 
+    def to_message(self, id: int, codec: JsonCodec | None = None) -> bytes:
+        codec = codec or get_default_codec()
+        results = self.results
+
+        # the json of frozen results can only be spliced into messages that have the default framing
+        if type(codec).encode_message is not JsonCodec.encode_message or not any(
+            result._frozen_json is not None for result in results
+        ):
+            return super().to_message(id, codec)
+
+        fragments: list[bytes] = []
+        unfrozen: list[dict[str, Any]] = []
+        for result in results:
+            fragment = result._frozen_json
+            if fragment is None:
+                unfrozen.append(result.to_dict())
+                continue
+
+            # runs of results that are not frozen are encoded together, without the brackets of their list
+            if unfrozen:
+                fragments.append(codec.dumps(unfrozen)[1:-1])
+                unfrozen = []
+            fragments.append(fragment)
+        if unfrozen:
+            fragments.append(codec.dumps(unfrozen)[1:-1])
+
+        return b"".join(
+            (
+                b'{"jsonrpc":"2.0","result":{"result":[',
+                b",".join(fragments),
+                b'],"SettingsChange":',
+                codec.dumps(self.settings_changes),
+                b',"debugMessage":',
+                codec.dumps(self.debug_message),
+                b'},"id":',
+                codec.dumps(id),
+                b"}\r\n",
+            )
+        )
+
 
 class ExecuteResponse(BaseResponse):
     r"""This response is a generic response for jsonrpc requests, most notably result callbacks.
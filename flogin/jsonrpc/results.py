@@ -1,31 +1,139 @@
 from __future__ import annotations
 
+import inspect
 import logging
-import random
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    ClassVar,
     Coroutine,
     Generic,
     Iterable,
     NotRequired,
     Self,
     TypedDict,
+    TypeVar,
     TypeVarTuple,
     Unpack,
+    overload,
 )
 
 from .._types import PluginT, SearchHandlerCallbackReturns
-from ..utils import MISSING, cached_property, copy_doc
-from .base_object import Base
+from ..utils import MISSING, copy_doc
+from .base_object import Base, compile_function
+from .codec import get_default_codec
 from .responses import ErrorResponse, ExecuteResponse
+from .slugs import SlugStrategy, counter_slug
 
+if TYPE_CHECKING:
+    from .codec import JsonCodec
+
+T = TypeVar("T")
 TS = TypeVarTuple("TS")
 LOG = logging.getLogger(__name__)
 
 __all__ = ("Result", "ResultPreview", "ProgressBar", "Glyph")
 
+# the attributes of a result and their keys in flow's json, in the order that they are sent in
+_RESULT_FIELDS = (
+    ("title", "title"),
+    ("sub", "subTitle"),
+    ("icon", "icoPath"),
+    ("title_highlight_data", "titleHighlightData"),
+    ("title_tooltip", "titleTooltip"),
+    ("sub_tooltip", "subtitleTooltip"),
+    ("copy_text", "copyText"),
+    ("callback", "jsonRPCAction"),
+    ("context_menu", "ContextData"),
+    ("score", "score"),
+    ("preview", "preview"),
+    ("auto_complete_text", "autoCompleteText"),
+    ("progress_bar", None),
+    ("rounded_icon", "RoundedIcon"),
+    ("glyph", "Glyph"),
+)
+_NESTED_RESULT_FIELDS = frozenset(("preview", "glyph"))
+# flogin sets these on results that it receives a callback or context menu request for
+_FROZEN_WRITABLE_ATTRIBUTES = frozenset(("plugin",))
+_frozen_classes: dict[type[Result], type[Result]] = {}
+
+
+class _SparseField(Generic[T]):
+    # an optional attribute of a result that is usually None, which is only stored when it is set
+    __slots__ = ("name",)
+
+    def __set_name__(self, owner: type[Result], name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, instance: None, owner: type[Result]) -> Self: ...
+
+    @overload
+    def __get__(self, instance: Result, owner: type[Result]) -> T | None: ...
+
+    def __get__(self, instance: Result | None, owner: type[Result]) -> Any:
+        if instance is None:
+            return self
+        try:
+            extras = instance._extras
+        except AttributeError:
+            # subclasses do not always call Result.__init__
+            return None
+        return None if extras is None else extras.get(self.name)
+
+    def __set__(self, instance: Result, value: T | None) -> None:
+        extras = getattr(instance, "_extras", None)
+        if value is None:
+            if extras is not None:
+                extras.pop(self.name, None)
+        elif extras is None:
+            instance._extras = {self.name: value}
+        else:
+            extras[self.name] = value
+
+    def __delete__(self, instance: Result) -> None:
+        self.__set__(instance, None)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self.name!r}>"
+
+
+def _frozen_class(cls: type[Result]) -> type[Result]:
+    frozen = _frozen_classes.get(cls)
+    if frozen is not None:
+        return frozen
+
+    setattr_ = cls.__setattr__
+
+    def __setattr__(self: Result, name: str, value: Any) -> None:
+        if name not in _FROZEN_WRITABLE_ATTRIBUTES:
+            raise AttributeError(f"{name!r} can not be set, since the result is frozen")
+        setattr_(self, name, value)
+
+    def __delattr__(self: Result, name: str) -> None:
+        raise AttributeError(f"{name!r} can not be deleted, since the result is frozen")
+
+    def to_dict(self: Result) -> dict[str, Any]:
+        return dict(self._frozen_dict)  # type: ignore
+
+    to_dict.__doc__ = cls.to_dict.__doc__
+
+    # the frozen class keeps the name of the original class, so that it looks the same in reprs and slugs
+    frozen = _frozen_classes[cls] = type(cls)(
+        cls.__name__,
+        (cls,),
+        {
+            "__slots__": (),
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+            "__setattr__": __setattr__,
+            "__delattr__": __delattr__,
+            "to_dict": to_dict,
+        },
+    )
+    return frozen
+
 
 class Glyph(Base):
     r"""This represents a glyth object with flow launcher, which is an alternative to :class:`~flogin.jsonrpc.results.Result` icons.
@@ -184,8 +292,37 @@ class Result(Base, Generic[PluginT]):
         Whether to have round the icon or not.
     glyth: Optional[:class:`~flogin.jsonrpc.results.Glyph`]
         The :class:`~flogin.jsonrpc.results.Glyph` object that will serve as the result's icon. If this and :attr:`~flogin.jsonrpc.results.Result.icon` are passed, the user's ``Use Segoe Fluent Icons`` setting will determine which is used.
+    slug_strategy: Callable[[:class:`~flogin.jsonrpc.results.Result`], :class:`str`]
+        A class attribute that determines how :attr:`~flogin.jsonrpc.results.Result.slug` is generated. Override it in a subclass, or set it on :class:`~flogin.jsonrpc.results.Result` to change it for every result. See :mod:`flogin.jsonrpc.slugs` for the built in strategies. Defaults to :obj:`~flogin.jsonrpc.slugs.counter_slug`
     """
 
+    # the optional attributes that are usually not set are stored in ``_extras``, and ``__dict__`` is only created
+    # for results that get other attributes, such as the callback that create_with_partial sets
+    __slots__ = (
+        "title",
+        "sub",
+        "icon",
+        "title_highlight_data",
+        "score",
+        "plugin",
+        "_extras",
+        "_slug",
+        "__dict__",
+        "__weakref__",
+    )
+
+    slug_strategy: ClassVar[SlugStrategy] = counter_slug
+    _frozen_json: bytes | None = None
+
+    title_tooltip: _SparseField[str] = _SparseField()
+    sub_tooltip: _SparseField[str] = _SparseField()
+    copy_text: _SparseField[str] = _SparseField()
+    auto_complete_text: _SparseField[str] = _SparseField()
+    preview: _SparseField[ResultPreview] = _SparseField()
+    progress_bar: _SparseField[ProgressBar] = _SparseField()
+    rounded_icon: _SparseField[bool] = _SparseField()
+    glyph: _SparseField[Glyph] = _SparseField()
+
     def __init__(
         self,
         title: str | None = None,
@@ -206,16 +343,31 @@ class Result(Base, Generic[PluginT]):
         self.sub = sub
         self.icon = icon
         self.title_highlight_data = title_highlight_data
+        self.score = score
+        self.plugin: PluginT | None = None
+        self._slug: str | None = None
+        self._extras: dict[str, Any] | None = None
+
+        if (
+            title_tooltip is None
+            and sub_tooltip is None
+            and copy_text is None
+            and auto_complete_text is None
+            and preview is None
+            and progress_bar is None
+            and rounded_icon is None
+            and glyph is None
+        ):
+            return
+
         self.title_tooltip = title_tooltip
         self.sub_tooltip = sub_tooltip
         self.copy_text = copy_text
-        self.score = score
         self.auto_complete_text = auto_complete_text
         self.preview = preview
         self.progress_bar = progress_bar
         self.rounded_icon = rounded_icon
         self.glyph = glyph
-        self.plugin: PluginT | None = None
 
     async def on_error(self, error: Exception) -> ErrorResponse | ExecuteResponse:
         r"""|coro|
@@ -306,47 +458,77 @@ class Result(Base, Generic[PluginT]):
             )
             return ErrorResponse.internal_error(error)
 
-    def to_dict(self) -> dict[str, Any]:
-        r"""This converts the result into a json serializable dictionary
-
-        Returns
-        -------
-        dict[:class:`str`, Any]
-        """
-
-        x: dict[str, Any] = {}
-
-        if self.title is not None:
-            x["title"] = self.title
-        if self.sub is not None:
-            x["subTitle"] = self.sub
-        if self.icon is not None:
-            x["icoPath"] = self.icon
-        if self.title_highlight_data is not None:
-            x["titleHighlightData"] = self.title_highlight_data
-        if self.title_tooltip is not None:
-            x["titleTooltip"] = self.title_tooltip
-        if self.sub_tooltip is not None:
-            x["subtitleTooltip"] = self.sub_tooltip
-        if self.copy_text is not None:
-            x["copyText"] = self.copy_text
-        if self.callback is not None:
-            x["jsonRPCAction"] = {"method": f"flogin.action.{self.slug}"}
-        if self.context_menu is not None:
-            x["ContextData"] = [self.slug]
-        if self.score is not None:
-            x["score"] = self.score
-        if self.preview is not None:
-            x["preview"] = self.preview.to_dict()
-        if self.auto_complete_text is not None:
-            x["autoCompleteText"] = self.auto_complete_text
-        if self.progress_bar is not None:
-            x.update(self.progress_bar.to_dict())
-        if self.rounded_icon is not None:
-            x["RoundedIcon"] = self.rounded_icon
-        if self.glyph is not None:
-            x["Glyph"] = self.glyph.to_dict()
-        return x
+    @classmethod
+    def _compile_to_dict(cls) -> Callable[[Self], dict[str, Any]]:
+        lines = [
+            "def to_dict(self):",
+            "    data = {}",
+            "    try:",
+            "        extras = self._extras",
+            "    except AttributeError:",
+            "        extras = None",
+        ]
+
+        # the slug is read from its slot, unless a subclass replaced the property
+        if inspect.getattr_static(cls, "slug", None) is Result.__dict__["slug"]:
+            lines.extend(
+                (
+                    "    try:",
+                    "        slug = self._slug",
+                    "    except AttributeError:",
+                    "        slug = None",
+                )
+            )
+        else:
+            lines.append("    slug = None")
+        in_extras = False
+
+        for name, key in _RESULT_FIELDS:
+            # subclasses could replace a sparse field with their own attribute
+            sparse = isinstance(inspect.getattr_static(cls, name, None), _SparseField)
+            if sparse and not in_extras:
+                # results usually have no sparse fields, so each run of them is skipped at once
+                lines.append("    if extras is not None:")
+            in_extras = sparse
+            indent = "        " if sparse else "    "
+
+            if name == "callback":
+                field_lines = (
+                    "if self.callback is not None:",
+                    "    if slug is None:",
+                    "        slug = self.slug",
+                    f"    data[{key!r}] = {{'method': f'flogin.action.{{slug}}'}}",
+                )
+            elif name == "context_menu":
+                field_lines = (
+                    "if self.context_menu is not None:",
+                    "    if slug is None:",
+                    "        slug = self.slug",
+                    f"    data[{key!r}] = [slug]",
+                )
+            else:
+                if name == "progress_bar":
+                    # the progress bar's keys are part of the result itself
+                    setter = "data.update(value.to_dict())"
+                elif name in _NESTED_RESULT_FIELDS:
+                    setter = f"data[{key!r}] = value.to_dict()"
+                else:
+                    setter = f"data[{key!r}] = value"
+
+                field_lines = (
+                    (
+                        f"value = extras.get({name!r})"
+                        if sparse
+                        else f"value = self.{name}"
+                    ),
+                    "if value is not None:",
+                    f"    {setter}",
+                )
+
+            lines.extend(indent + line for line in field_lines)
+
+        lines.append("    return data")
+        return compile_function("to_dict", lines, {})
 
     @classmethod
     def from_dict(cls: type[Self], data: dict[str, Any]) -> Self:
@@ -426,13 +608,59 @@ class Result(Base, Generic[PluginT]):
         self.callback = partial_callback
         return self
 
-    @cached_property
+    def freeze(self, codec: JsonCodec | None = None) -> Self:
+        r"""Makes the result immutable, and encodes its json once, so that it does not have to be built again every time that the result is sent to flow.
+
+        This is meant for results that are sent again and again without changing, such as help entries, lists of commands, or "no results" placeholders. The json of frozen results is spliced directly into the message of a :class:`~flogin.jsonrpc.responses.QueryResponse`.
+
+        Once the result is frozen, setting or deleting any attribute other than :attr:`~flogin.jsonrpc.results.Result.plugin` raises :class:`AttributeError`. Objects that the result holds, such as its :attr:`~flogin.jsonrpc.results.Result.preview`, are not frozen, and changes to them are not sent.
+
+        .. NOTE::
+            To block changes, the result becomes an instance of a subclass of its class, which has the same name.
+
+        Parameters
+        ----------
+        codec: Optional[:class:`~flogin.jsonrpc.codec.JsonCodec`]
+            The codec to encode the result with. Defaults to :func:`~flogin.jsonrpc.codec.get_default_codec`
+
+        Returns
+        -------
+        :class:`~flogin.jsonrpc.results.Result`
+            The result, so that it can be created and frozen in one expression. Freezing a result that is already frozen does nothing.
+        """
+
+        if self.frozen:
+            return self
+
+        # the slug is cached on the result, which is not possible once it is frozen
+        self.slug
+        data = self.to_dict()
+        self._frozen_dict = data
+        self._frozen_json = (codec or get_default_codec()).dumps(data)
+        self.__class__ = _frozen_class(type(self))
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        """:class:`bool`: Whether or not the result has been frozen with :func:`~flogin.jsonrpc.results.Result.freeze`"""
+        return self._frozen_json is not None
+
+    @property
     def slug(self) -> str:
-        return "".join(
-            random.choices(
-                "QWERTYUIOPASDFGHJKLZXCVBNMqwertyuiopasdfghjklzxcvbnm1234567890", k=15
-            )
-        )
+        """:class:`str`: The identifier that flow uses to tell flogin which result was clicked on, generated with :attr:`~flogin.jsonrpc.results.Result.slug_strategy` the first time that it is used"""
+
+        try:
+            slug = self._slug
+        except AttributeError:
+            # subclasses do not always call Result.__init__
+            slug = None
+        if slug is None:
+            slug = self._slug = type(self).slug_strategy(self)
+        return slug
+
+    @slug.setter
+    def slug(self, value: str) -> None:
+        self._slug = value
 
     def __repr__(self):
         return f"<{self.__class__.__name__} {self.title=} {self.sub=} {self.icon=} {self.title_highlight_data=} {self.title_tooltip=} {self.sub_tooltip=} {self.copy_text=} {self.score=} {self.auto_complete_text=} {self.preview=} {self.progress_bar=} {self.rounded_icon=} {self.glyph=}>"
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import itertools
+import random
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from .results import Result
+
+__all__ = ("CounterSlugs", "counter_slug", "content_slug", "random_slug")
+
+SlugStrategy = Callable[["Result"], str]
+
+
+class CounterSlugs:
+    r"""A slug strategy that gives every result the next number of a counter, in hex.
+
+    This is the cheapest strategy, and slugs are guaranteed to never collide within a session. :func:`~flogin.jsonrpc.slugs.counter_slug` is the shared instance that :class:`~flogin.jsonrpc.results.Result` uses by default.
+    """
+
+    __slots__ = ("_counter",)
+
+    def __init__(self) -> None:
+        self._counter = itertools.count(1)
+
+    def __call__(self, result: Result) -> str:
+        return format(next(self._counter), "x")
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}>"
+
+
+counter_slug = CounterSlugs()
+
+
+def random_slug(result: Result) -> str:
+    r"""A slug strategy that gives every result 15 random characters.
+
+    Parameters
+    ----------
+    result: :class:`~flogin.jsonrpc.results.Result`
+        The result
+
+    Returns
+    -------
+    :class:`str`
+    """
+
+    return "".join(
+        random.choices(
+            "QWERTYUIOPASDFGHJKLZXCVBNMqwertyuiopasdfghjklzxcvbnm1234567890", k=15
+        )
+    )
+
+
+def _callable_key(func: Any) -> Any:
+    if isinstance(func, functools.partial):
+        return (
+            id(func.func),
+            func.args,
+            tuple(sorted(func.keywords.items())),
+        )
+    return id(getattr(func, "__func__", func))
+
+
+def content_slug(result: Result) -> str:
+    r"""A slug strategy that hashes the result's class, title, subtitle, :func:`~flogin.jsonrpc.results.Result.callback` and :func:`~flogin.jsonrpc.results.Result.context_menu`.
+
+    Results that look the same and have the same callbacks get the same slug, so they keep their slug across queries and are only registered once.
+
+    .. WARNING::
+        Only use this strategy if results with the same title, subtitle and callbacks also behave the same. For example, if your callbacks use an attribute that is not part of the title or subtitle, two results that differ only in that attribute would get the same slug, and clicking on either would run the callback of whichever was sent last.
+
+    Parameters
+    ----------
+    result: :class:`~flogin.jsonrpc.results.Result`
+        The result
+
+    Returns
+    -------
+    :class:`str`
+    """
+
+    key = (
+        type(result).__qualname__,
+        result.title,
+        result.sub,
+        _callable_key(result.callback),
+        _callable_key(result.context_menu),
+    )
+    return hashlib.blake2b(repr(key).encode(), digest_size=10).hexdigest()
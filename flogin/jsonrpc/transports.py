@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from asyncio.streams import FlowControlMixin, StreamReader, StreamWriter
+
+LOG = logging.getLogger(__name__)
+
+__all__ = (
+    "open_stdio_streams",
+    "open_tcp_streams",
+    "open_unix_streams",
+    "create_memory_pipe",
+    "MemoryWriter",
+)
+
+
+async def _open_pipe_streams(limit: int) -> tuple[StreamReader, StreamWriter]:
+    loop = asyncio.get_running_loop()
+
+    reader = StreamReader(limit=limit, loop=loop)
+    read_transport, _ = await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader, loop=loop), sys.stdin
+    )
+
+    try:
+        transport, protocol = await loop.connect_write_pipe(
+            FlowControlMixin, sys.stdout
+        )
+    except BaseException:
+        # don't leave stdin attached to the loop if we fall back to aioconsole
+        read_transport.close()
+        raise
+
+    writer = StreamWriter(transport, protocol, reader, loop)
+    return reader, writer
+
+
+async def _open_aioconsole_streams() -> tuple[StreamReader, StreamWriter]:
+    import aioconsole
+
+    return await aioconsole.get_standard_streams()  # type: ignore
+
+
+async def open_stdio_streams(
+    *, limit: int = 2**16
+) -> tuple[StreamReader, StreamWriter]:
+    r"""|coro|
+
+    On POSIX systems, this connects stdin and stdout to the running event loop with :meth:`~asyncio.loop.connect_read_pipe` and :meth:`~asyncio.loop.connect_write_pipe`.
+
+    On Windows, and when the event loop or the standard streams do not support pipe transports (for example, when stdin is a regular file or a console), `aioconsole <https://pypi.org/project/aioconsole>`_ is used instead. The pipes that flow gives plugins on Windows are not opened for overlapped io, so reading them through the proactor event loop would block the loop.
+
+    Parameters
+    ----------
+    limit: :class:`int`
+        The buffer limit of the reader
+
+    Returns
+    -------
+    tuple[:class:`asyncio.StreamReader`, :class:`asyncio.StreamWriter`]
+    """
+
+    if sys.platform == "win32":
+        return await _open_aioconsole_streams()
+
+    try:
+        return await _open_pipe_streams(limit)
+    except (OSError, ValueError, NotImplementedError, RuntimeError) as e:
+        LOG.info(f"Native stdio pipes are unavailable, falling back to aioconsole: {e}")
+        return await _open_aioconsole_streams()
+
+
+async def open_tcp_streams(
+    host: str, port: int, *, limit: int = 2**16
+) -> tuple[StreamReader, StreamWriter]:
+    r"""|coro|
+
+    Connects to a TCP server, for use with :func:`~flogin.jsonrpc.client.JsonRPCClient.start_listening`.
+
+    Parameters
+    ----------
+    host: :class:`str`
+        The host to connect to
+    port: :class:`int`
+        The port to connect to
+    limit: :class:`int`
+        The buffer limit of the reader
+
+    Returns
+    -------
+    tuple[:class:`asyncio.StreamReader`, :class:`asyncio.StreamWriter`]
+    """
+
+    return await asyncio.open_connection(host, port, limit=limit)
+
+
+async def open_unix_streams(
+    path: str, *, limit: int = 2**16
+) -> tuple[StreamReader, StreamWriter]:
+    r"""|coro|
+
+    Connects to a unix socket, for use with :func:`~flogin.jsonrpc.client.JsonRPCClient.start_listening`.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The path of the socket
+    limit: :class:`int`
+        The buffer limit of the reader
+
+    Returns
+    -------
+    tuple[:class:`asyncio.StreamReader`, :class:`asyncio.StreamWriter`]
+    """
+
+    return await asyncio.open_unix_connection(path, limit=limit)
+
+
+class MemoryWriter:
+    r"""A writer that feeds everything written to it directly into a :class:`asyncio.StreamReader`, without any OS pipes or sockets in between.
+
+    .. NOTE::
+        Do not initialize this class yourself, use :func:`~flogin.jsonrpc.transports.create_memory_pipe` instead.
+
+    Attributes
+    ----------
+    peer: :class:`asyncio.StreamReader`
+        The reader that receives the data
+    """
+
+    __slots__ = ("peer",)
+
+    def __init__(self, peer: StreamReader) -> None:
+        self.peer = peer
+
+    def write(self, data: bytes) -> None:
+        self.peer.feed_data(data)
+
+    def writelines(self, data: list[bytes]) -> None:
+        self.peer.feed_data(b"".join(data))
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.peer.feed_eof()
+
+    def is_closing(self) -> bool:
+        return self.peer.at_eof()
+
+    async def wait_closed(self) -> None:
+        pass
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} peer={self.peer!r}>"
+
+
+def create_memory_pipe(
+    *, limit: int = 2**16
+) -> tuple[tuple[StreamReader, MemoryWriter], tuple[StreamReader, MemoryWriter]]:
+    r"""Creates two pairs of in-memory streams that are connected to each other, which is useful for tests and benchmarks.
+
+    Data written to the writer of one pair can be read from the reader of the other pair. Closing a writer sends EOF to the other pair's reader.
+
+    Parameters
+    ----------
+    limit: :class:`int`
+        The buffer limit of the readers
+
+    Returns
+    -------
+    tuple[tuple[:class:`asyncio.StreamReader`, :class:`~flogin.jsonrpc.transports.MemoryWriter`], tuple[:class:`asyncio.StreamReader`, :class:`~flogin.jsonrpc.transports.MemoryWriter`]]
+    """
+
+    left = StreamReader(limit=limit)
+    right = StreamReader(limit=limit)
+    return (left, MemoryWriter(right)), (right, MemoryWriter(left))
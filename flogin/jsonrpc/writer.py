@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from asyncio.streams import StreamWriter
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ("BatchedWriter",)
+
+
+class BatchedWriter:
+    r"""Coalesces every message written during a single event loop iteration into one ``writelines`` call.
+
+    Writers are only made to wait for the underlying stream to drain once the amount of unsent data goes over :attr:`high_water_mark`, instead of after every message.
+
+    .. NOTE::
+        Do not initialize this class yourself, instead use the ``write_high_water_mark`` option of :class:`~flogin.plugin.Plugin`, and the :attr:`~flogin.jsonrpc.client.JsonRPCClient.output` attribute to get the instance.
+
+    Attributes
+    ----------
+    writer: :class:`asyncio.StreamWriter`
+        The stream that the messages get written to
+    high_water_mark: :class:`int`
+        The amount of unsent bytes after which writers have to wait for the stream to drain
+    on_error: Callable[[:class:`Exception`], None] | None
+        Called when a flush that was scheduled for the end of the event loop iteration fails, since there is no writer for the error to propagate to
+    bytes_written: :class:`int`
+        The total amount of bytes that have been flushed to the stream
+    messages_written: :class:`int`
+        The total amount of messages that have been flushed to the stream
+    flushes: :class:`int`
+        The total amount of ``writelines`` calls that have been made
+    drains: :class:`int`
+        The total amount of times that a writer had to wait for the stream to drain
+    """
+
+    def __init__(
+        self,
+        writer: StreamWriter,
+        *,
+        high_water_mark: int = 1048576,
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        self.writer = writer
+        self.high_water_mark = high_water_mark
+        self.on_error = on_error
+        self.bytes_written = 0
+        self.messages_written = 0
+        self.flushes = 0
+        self.drains = 0
+        self._buffer: list[bytes] = []
+        self._buffered_bytes = 0
+        self._flush_handle: asyncio.Handle | None = None
+
+    @property
+    def buffer_size(self) -> int:
+        """:class:`int`: The amount of bytes that have been written but not yet sent, including the stream's own buffer"""
+
+        size = self._buffered_bytes
+        transport = getattr(self.writer, "transport", None)
+        if transport is not None:
+            size += transport.get_write_buffer_size()
+        return size
+
+    async def write(self, data: bytes) -> None:
+        r"""|coro|
+
+        Queues a message to be flushed at the end of the current event loop iteration. If the buffer is over :attr:`high_water_mark`, this waits for the stream to drain.
+
+        Parameters
+        ----------
+        data: :class:`bytes`
+            The message
+        """
+
+        self._buffer.append(data)
+        self._buffered_bytes += len(data)
+
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(
+                self._scheduled_flush
+            )
+
+        if self.buffer_size >= self.high_water_mark:
+            await self.drain()
+
+    def _scheduled_flush(self) -> None:
+        self._flush_handle = None
+        try:
+            self.flush()
+        except Exception as e:
+            LOG.exception("Failed to flush messages", exc_info=e)
+            if self.on_error is not None:
+                self.on_error(e)
+
+    def flush(self) -> None:
+        r"""Writes every queued message to the stream with a single ``writelines`` call, or a single ``write`` call if the stream does not support ``writelines``."""
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._buffer:
+            return
+
+        buffer = self._buffer
+        self._buffer = []
+        size = self._buffered_bytes
+        self._buffered_bytes = 0
+        LOG.debug(f"Flushing {len(buffer)} message(s), {size} bytes")
+
+        writelines = getattr(self.writer, "writelines", None)
+        if writelines is None:
+            self.writer.write(b"".join(buffer))
+        else:
+            writelines(buffer)
+        self.bytes_written += size
+        self.messages_written += len(buffer)
+        self.flushes += 1
+
+    async def drain(self) -> None:
+        r"""|coro|
+
+        Flushes the queued messages, then waits for the stream to drain.
+        """
+
+        self.flush()
+        self.drains += 1
+        await self.writer.drain()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.bytes_written=} {self.messages_written=} {self.flushes=} {self.drains=}>"
@@ -5,10 +5,13 @@ import json
 import logging
 import os
 import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from inspect import isasyncgen, isgenerator
 from typing import (
     TYPE_CHECKING,
     Any,
     AsyncIterable,
+    AsyncIterator,
     Awaitable,
     Callable,
     Coroutine,
@@ -30,9 +33,13 @@ from .jsonrpc import (
     QueryResponse,
     Result,
 )
+from .jsonrpc.admission import AdmissionController
+from .jsonrpc.registry import ResultRegistry
 from .jsonrpc.responses import BaseResponse
+from .jsonrpc.transports import open_stdio_streams
 from .query import Query
-from .search_handler import SearchHandler
+from .routing import SearchHandlerRouter
+from .search_handler import IncrementalSearchHandler, SearchHandler
 from .settings import Settings
 from .utils import MISSING, cached_property, coro_or_gen, setup_logging
 
@@ -40,6 +47,7 @@ if TYPE_CHECKING:
     from typing_extensions import TypeVar
 
     from ._types import RawSettings, SearchHandlerCallback, SearchHandlerCondition
+    from .search_handler import ExecutorLike
 
     SettingsT = TypeVar("SettingsT", default=Settings, bound=Settings)
 else:
@@ -54,11 +62,70 @@ LOG = logging.getLogger(__name__)
 __all__ = ("Plugin",)
 
 
+def _call_sync_callback(callback: Callable[[Query], Any], query: Query) -> Any:
+    # this runs in an executor, possibly in another process, so generators have to be consumed here
+    result = callback(query)
+    if isgenerator(result):
+        return list(result)
+    return result
+
+
 class Plugin(Generic[SettingsT]):
     r"""This class represents your plugin.
 
     This class impliments a generic for a custom :class:`~flogin.settings.Settings` class for typechecking purposes.
 
+    Parameters
+    --------
+    settings_no_update: :class:`bool`
+        Whether or not to send setting changes back to flow. Defaults to ``False``
+    codec: Optional[:class:`~flogin.jsonrpc.codec.JsonCodec`]
+        The codec to use when encoding and decoding messages. Defaults to :func:`~flogin.jsonrpc.codec.get_default_codec`
+    max_concurrent_requests: :class:`int` | dict[:class:`str`, :class:`int` | None] | None
+        The max amount of requests from flow that can be handled at once per method. A dict can be passed to set limits for specific methods, where the ``"*"`` key sets the default. ``None`` means unlimited. Defaults to ``32``
+    max_queued_requests: :class:`int` | None
+        The max amount of requests per method that can wait for a free slot before the oldest one is dropped. ``None`` means unlimited. Defaults to ``128``
+    request_overflow: Literal["queue", "shed"]
+        Whether requests that arrive while their method is at its limit should be queued or dropped. Defaults to ``"queue"``
+    request_timeout: :class:`float` | None
+        The default amount of seconds to wait for flow to respond to a :class:`~flogin.flow.api.FlowLauncherAPI` request. ``None`` means no timeout. Defaults to ``30``
+    write_high_water_mark: :class:`int`
+        The amount of unsent bytes after which writing a message waits for stdout to drain. Defaults to 1 MiB
+    read_size: :class:`int`
+        The max amount of bytes to read from stdin at once. Defaults to 64 KiB
+    max_message_size: :class:`int` | None
+        The max size of a single message from flow, in bytes. Larger messages are discarded. ``None`` means unlimited. Defaults to 16 MiB
+    result_retention: Literal["generations", "lru", "weak"]
+        How long results are kept around so that their callbacks and context menus can be used. See :class:`~flogin.jsonrpc.registry.ResultRegistry` for more info. Defaults to ``"generations"``
+    max_result_generations: :class:`int`
+        The amount of queries to keep results for, when using the ``"generations"`` retention mode. Defaults to ``5``
+    max_results: :class:`int`
+        The max amount of results to keep, when using the ``"lru"`` retention mode. Defaults to ``2048``
+    fuzzy_search_cache_size: :class:`int` | None
+        The max amount of :func:`~flogin.flow.api.FlowLauncherAPI.fuzzy_search` results to cache. ``None`` means unlimited, and ``0`` disables the cache. Defaults to ``1024``
+    max_thread_workers: :class:`int` | None
+        The max amount of threads in the pool that search handlers with ``executor="thread"`` run in. ``None`` uses the default of :class:`concurrent.futures.ThreadPoolExecutor`. Defaults to ``None``
+    max_process_workers: :class:`int` | None
+        The max amount of processes in the pool that search handlers with ``executor="process"`` run in. ``None`` uses the default of :class:`concurrent.futures.ProcessPoolExecutor`. Defaults to ``None``
+    supersede_queries: :class:`bool`
+        Whether or not to cancel the search handler that is handling a query once a newer query is received. Superseded queries get an empty response. Defaults to ``False``
+    query_debounce: :class:`float` | None
+        The amount of seconds to wait before running a search handler. If a newer query is received during that time, the older query is skipped and gets an empty response. Defaults to ``None``
+    fan_out_search_handlers: :class:`bool`
+        Whether or not to run every search handler that matches a query at once, instead of only the first one. Their results are merged and sorted by :attr:`~flogin.jsonrpc.results.Result.score`, and results are not streamed. If every handler fails, the first error response is sent. Defaults to ``False``
+    search_handler_timeout: :class:`float` | None
+        The max amount of seconds that a search handler can run for when ``fan_out_search_handlers`` is enabled. The results of handlers that time out are left out. ``None`` means no timeout. Defaults to ``None``
+    query_budget: :class:`float` | None
+        The max amount of seconds to wait for search handlers when ``fan_out_search_handlers`` is enabled. Once it is exceeded, the handlers that are still running are cancelled, and the results of the handlers that finished are sent. ``None`` means no limit. Defaults to ``None``
+    stream_results: :class:`bool`
+        Whether or not to stream the results of search handlers that are async generators. When enabled, the results that were yielded within ``stream_time_slice`` seconds, or the first ``stream_batch_size`` results, are sent as the response to the query, and the rest are sent with :func:`~flogin.flow.api.FlowLauncherAPI.update_results` as they come in. Defaults to ``False``
+    stream_time_slice: :class:`float`
+        The max amount of seconds to wait for results before the first batch of a streamed query is sent. Defaults to ``0.05``
+    stream_batch_size: :class:`int`
+        The amount of results after which the first batch of a streamed query is sent, even if ``stream_time_slice`` has not passed yet. Defaults to ``20``
+    stream_flush_interval: :class:`float`
+        The min amount of seconds between two updates of a streamed query. Defaults to ``0.1``
+
     Attributes
     --------
     settings: :class:`~flogin.settings.Settings`
@@ -68,16 +135,51 @@ class Plugin(Generic[SettingsT]):
     """
 
     def __init__(self, **options: Any) -> None:
-        self.jsonrpc: JsonRPCClient = JsonRPCClient(self)
-        self.api = FlowLauncherAPI(self.jsonrpc)
+        self.options = options
+        self.jsonrpc: JsonRPCClient = JsonRPCClient(
+            self,
+            codec=options.get("codec"),
+            admission=self._create_admission(),
+            request_timeout=options.get("request_timeout", 30),
+            write_high_water_mark=options.get("write_high_water_mark", 1048576),
+            read_size=options.get("read_size", 2**16),
+            max_message_size=options.get("max_message_size", 2**24),
+        )
+        self.api = FlowLauncherAPI(
+            self.jsonrpc,
+            fuzzy_search_cache_size=options.get("fuzzy_search_cache_size", 1024),
+        )
         self._metadata: PluginMetadata | None = None
         self._events: dict[str, Callable[..., Awaitable[Any]]] = get_default_events(
             self
         )
-        self._search_handlers: list[SearchHandler] = []
-        self._results: dict[str, Result] = {}
+        self._router = SearchHandlerRouter()
+        self._search_handlers: list[SearchHandler] = self._router.handlers
+        self._results: ResultRegistry = ResultRegistry(
+            retention=options.get("result_retention", "generations"),
+            max_generations=options.get("max_result_generations", 5),
+            max_size=options.get("max_results", 2048),
+        )
         self._settings_are_populated: bool = False
-        self.options = options
+        self._query_generation: int = 0
+        self._query_task: asyncio.Task | None = None
+        self._executors: dict[str, Executor] = {}
+
+    def _create_admission(self) -> AdmissionController:
+        max_concurrent = self.options.get("max_concurrent_requests", 32)
+        if isinstance(max_concurrent, dict):
+            limits = dict(max_concurrent)
+            default_limit = limits.pop("*", 32)
+        else:
+            limits = {}
+            default_limit = max_concurrent
+
+        return AdmissionController(
+            default_limit=default_limit,
+            limits=limits,
+            max_queued=self.options.get("max_queued_requests", 128),
+            overflow=self.options.get("request_overflow", "queue"),
+        )
 
     @cached_property
     def settings(self) -> SettingsT:
@@ -144,8 +246,10 @@ class Plugin(Generic[SettingsT]):
     async def _coro_or_gen_to_results(
         self, coro: Awaitable | AsyncIterable
     ) -> list[Result] | ErrorResponse:
+        return self._convert_results(await coro_or_gen(coro))
+
+    def _convert_results(self, raw_results: Any) -> list[Result] | ErrorResponse:
         results = []
-        raw_results = await coro_or_gen(coro)
 
         if raw_results is None:
             return results
@@ -154,17 +258,125 @@ class Plugin(Generic[SettingsT]):
             return raw_results
         if isinstance(raw_results, dict):
             res = Result.from_dict(raw_results)
-            self._results[res.slug] = res
+            self._results.add(res)
             results.append(res)
         else:
             if not isinstance(raw_results, list):
                 raw_results = [raw_results]
             for raw_res in raw_results:
                 res = Result.from_anything(raw_res)
-                self._results[res.slug] = res
+                self._results.add(res)
                 results.append(res)
         return results
 
+    async def _collect_with_deadline(
+        self,
+        handler: SearchHandler[Any],
+        coro: Awaitable | AsyncIterable,
+        query: Query,
+    ) -> list[Result] | ErrorResponse:
+        results: list[Result] = []
+
+        try:
+            async with asyncio.timeout(handler.deadline) as timeout:
+                if not isasyncgen(coro):
+                    return await self._coro_or_gen_to_results(coro)
+
+                # results are kept as they come in, so that the ones yielded before the deadline can be sent
+                try:
+                    async for item in coro:
+                        res = Result.from_anything(item)
+                        self._results.add(res)
+                        results.append(res)
+                finally:
+                    await coro.aclose()
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            await handler.on_deadline_exceeded(query, results)
+
+        return results
+
+    async def _stream_gen_results(
+        self, gen: AsyncIterator[Any], query: Query, generation: int, name: str
+    ) -> list[Result]:
+        results: list[Result] = []
+        first_batch = asyncio.Event()
+        batch_size = self.options.get("stream_batch_size", 20)
+
+        async def consume() -> None:
+            try:
+                async for item in gen:
+                    if generation != self._query_generation:
+                        break
+                    res = Result.from_anything(item)
+                    self._results.add(res)
+                    results.append(res)
+                    if len(results) >= batch_size:
+                        first_batch.set()
+            finally:
+                await gen.aclose()  # type: ignore
+
+        consumer = asyncio.create_task(consume(), name=f"flogin: {name} consumer")
+        waiter = asyncio.create_task(first_batch.wait())
+        try:
+            await asyncio.wait(
+                (consumer, waiter),
+                timeout=self.options.get("stream_time_slice", 0.05),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        except asyncio.CancelledError:
+            consumer.cancel()
+            raise
+        finally:
+            waiter.cancel()
+
+        if consumer.done():
+            # raises the handler's error, so that it gets handled the same way as without streaming
+            consumer.result()
+            return results
+
+        self._schedule_event(
+            self._push_streamed_results,
+            event_name=f"{name}-stream",
+            args=[consumer, results, query, generation],
+        )
+        return results[:]
+
+    async def _push_streamed_results(
+        self,
+        consumer: asyncio.Task[None],
+        results: list[Result],
+        query: Query,
+        generation: int,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.options.get("stream_flush_interval", 0.1)
+        sent = len(results)
+        # the first batch was just returned as the query response, so it counts as a flush
+        last_flush = loop.time()
+
+        try:
+            while True:
+                await asyncio.wait((consumer,), timeout=interval)
+                delay = last_flush + interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if generation != self._query_generation:
+                    LOG.debug(f"Stopping the stream of superseded query {query!r}")
+                    return
+
+                if len(results) > sent:
+                    sent = len(results)
+                    await self.api.update_results(query.raw_text, results[:sent])
+                    last_flush = loop.time()
+
+                if consumer.done():
+                    consumer.result()
+                    return
+        finally:
+            consumer.cancel()
+
     async def _initialize_wrapper(self, arg: dict[str, Any]) -> ExecuteResponse:
         LOG.info(f"Initialize: {json.dumps(arg)}")
         self._metadata = PluginMetadata(arg["currentPluginMetadata"], self.api)
@@ -199,28 +411,178 @@ class Plugin(Generic[SettingsT]):
             return results
         return QueryResponse(results, self.settings._get_updates())
 
+    def _get_executor(self, executor: Executor | str) -> Executor:
+        if isinstance(executor, Executor):
+            return executor
+
+        pool = self._executors.get(executor)
+        if pool is None:
+            if executor == "thread":
+                pool = ThreadPoolExecutor(
+                    self.options.get("max_thread_workers"),
+                    thread_name_prefix="flogin",
+                )
+            else:
+                pool = ProcessPoolExecutor(self.options.get("max_process_workers"))
+            self._executors[executor] = pool
+        return pool
+
+    def _shutdown_executors(self) -> None:
+        for pool in self._executors.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+
+    async def _run_in_executor(self, handler: SearchHandler[Any], query: Query) -> Any:
+        executor = self._get_executor(handler.executor)  # type: ignore
+
+        if isinstance(executor, ProcessPoolExecutor):
+            condition_data = query.condition_data
+            query = Query(query._data.copy(), None)
+            query.condition_data = condition_data
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, _call_sync_callback, handler.callback, query
+        )
+
+    def _schedule_search_handler(
+        self,
+        handler: SearchHandler[Any],
+        query: Query,
+        generation: int,
+        *,
+        stream: bool = True,
+    ) -> asyncio.Task[list[Result] | ErrorResponse | None]:
+        handler.plugin = self
+        event_name = f"SearchHandler-{handler.name}"
+        if handler.executor is not None:
+            coro = self._run_in_executor(handler, query)
+        else:
+            coro = handler.callback(query)
+
+        if handler.deadline is not None:
+            target = self._collect_with_deadline
+            args = [handler, coro, query]
+        elif stream and self.options.get("stream_results", False) and isasyncgen(coro):
+            target = self._stream_gen_results
+            args = [coro, query, generation, event_name]
+        else:
+            target = self._coro_or_gen_to_results
+            args = [coro]
+
+        return self._schedule_event(
+            target,
+            event_name=event_name,
+            args=args,
+            error_handler=lambda e: self._coro_or_gen_to_results(
+                handler.on_error(query, e)
+            ),
+        )
+
+    async def _fan_out_search_handlers(
+        self, query: Query, generation: int
+    ) -> list[Result] | ErrorResponse:
+        handler_timeout = self.options.get("search_handler_timeout")
+        outputs: dict[int, list[Result] | ErrorResponse | None] = {}
+
+        async def run(
+            position: int, handler: SearchHandler, handler_query: Query
+        ) -> None:
+            # each handler's results would overwrite the others with update_results, so nothing is streamed
+            task = self._schedule_search_handler(
+                handler, handler_query, generation, stream=False
+            )
+            try:
+                outputs[position] = await asyncio.wait_for(task, handler_timeout)
+            except TimeoutError:
+                LOG.debug(f"Search handler {handler.name} timed out")
+
+        try:
+            async with asyncio.timeout(self.options.get("query_budget")):
+                async with asyncio.TaskGroup() as group:
+                    for position, handler in enumerate(self._router.route(query)):
+                        # every handler gets its own query, so that they each keep their own condition data
+                        handler_query = Query(query._data.copy(), self)
+                        handler_query.condition_data = query.condition_data
+                        query.condition_data = None
+                        group.create_task(run(position, handler, handler_query))
+        except TimeoutError:
+            LOG.debug(f"Query budget exceeded for {query!r}, sending partial results")
+
+        results: list[Result] = []
+        error: ErrorResponse | None = None
+        for position in sorted(outputs):
+            output = outputs[position]
+            if isinstance(output, ErrorResponse):
+                error = error or output
+            elif output:
+                results.extend(output)
+
+        if error is not None and not results:
+            return error
+
+        # sort is stable, so results with the same score stay in the order of their handlers
+        results.sort(key=lambda result: result.score or 0, reverse=True)
+        return results
+
     async def process_search_handlers(
         self, query: Query
     ) -> QueryResponse | ErrorResponse:
-        results = []
-        for handler in self._search_handlers:
-            handler.plugin = self
-            if handler.condition(query):
-                task = self._schedule_event(
-                    self._coro_or_gen_to_results,
-                    event_name=f"SearchHandler-{handler.name}",
-                    args=[handler.callback(query)],
-                    error_handler=lambda e: self._coro_or_gen_to_results(
-                        handler.on_error(query, e)
-                    ),
-                )
-                results = await task
+        self._query_generation += 1
+        generation = self._query_generation
+        self._results.new_generation()
+
+        if self._query_task is not None and self.options.get(
+            "supersede_queries", False
+        ):
+            LOG.debug(f"Cancelling superseded query task {self._query_task!r}")
+            self._query_task.cancel()
+
+        debounce = self.options.get("query_debounce")
+        if debounce:
+            await asyncio.sleep(debounce)
+            if generation != self._query_generation:
+                LOG.debug(f"Skipping superseded query {query!r}")
+                return QueryResponse([])
+
+        task = None
+        if self.options.get("fan_out_search_handlers", False):
+            task = self._schedule_event(
+                self._fan_out_search_handlers,
+                event_name="SearchHandlers-fan-out",
+                args=[query, generation],
+            )
+        else:
+            for handler in self._router.route(query):
+                task = self._schedule_search_handler(handler, query, generation)
                 break
 
+        results = []
+        if task is not None:
+            self._query_task = task
+            try:
+                results = await task
+            finally:
+                if self._query_task is task:
+                    self._query_task = None
+
+        if generation != self._query_generation and self.options.get(
+            "supersede_queries", False
+        ):
+            return QueryResponse([])
+        # _run_event swallows the CancelledError of a superseded handler task and returns None,
+        # so this also covers a handler that was cancelled after the check above
+        if results is None:
+            results = []
         if isinstance(results, ErrorResponse):
             return results
         return QueryResponse(results, self.settings._get_updates())
 
+    @property
+    def result_registry(self) -> ResultRegistry:
+        """:class:`~flogin.jsonrpc.registry.ResultRegistry`: The registry that keeps track of the results that have been sent to flow"""
+        return self._results
+
     @property
     def metadata(self) -> PluginMetadata:
         """
@@ -241,10 +603,11 @@ class Plugin(Generic[SettingsT]):
         The default startup/setup method. This can be overriden for advanced startup behavior, but make sure to run ``await super().start()`` to actually start your plugin.
         """
 
-        import aioconsole
-
-        reader, writer = await aioconsole.get_standard_streams()
-        await self.jsonrpc.start_listening(reader, writer)
+        reader, writer = await open_stdio_streams()
+        try:
+            await self.jsonrpc.start_listening(reader, writer)
+        finally:
+            self._shutdown_executors()
 
     def run(self, *, setup_default_log_handler: bool = True) -> None:
         r"""The default runner. This runs the :func:`~flogin.plugin.Plugin.start` coroutine, and setups up logging.
@@ -276,7 +639,7 @@ class Plugin(Generic[SettingsT]):
             The search handler to be registered
         """
 
-        self._search_handlers.append(handler)
+        self._router.add(handler)
         LOG.info(f"Registered search handler: {handler}")
 
     def register_search_handlers(self, *handlers: SearchHandler[Any]) -> None:
@@ -337,22 +700,41 @@ class Plugin(Generic[SettingsT]):
 
     @overload
     def search(
-        self, condition: SearchHandlerCondition
+        self,
+        condition: SearchHandlerCondition,
+        *,
+        deadline: float | None = ...,
+        incremental: bool = ...,
+        executor: ExecutorLike | None = ...,
     ) -> Callable[[SearchHandlerCallback], SearchHandler]: ...
 
     @overload
     def search(
-        self, *, text: str
+        self,
+        *,
+        text: str,
+        deadline: float | None = ...,
+        incremental: bool = ...,
+        executor: ExecutorLike | None = ...,
     ) -> Callable[[SearchHandlerCallback], SearchHandler]: ...
 
     @overload
     def search(
-        self, *, pattern: re.Pattern
+        self,
+        *,
+        pattern: re.Pattern,
+        deadline: float | None = ...,
+        incremental: bool = ...,
+        executor: ExecutorLike | None = ...,
     ) -> Callable[[SearchHandlerCallback], SearchHandler]: ...
 
     @overload
     def search(
         self,
+        *,
+        deadline: float | None = ...,
+        incremental: bool = ...,
+        executor: ExecutorLike | None = ...,
     ) -> Callable[[SearchHandlerCallback], SearchHandler]: ...
 
     def search(
@@ -361,6 +743,9 @@ class Plugin(Generic[SettingsT]):
         *,
         text: str = MISSING,
         pattern: re.Pattern = MISSING,
+        deadline: float | None = None,
+        incremental: bool = False,
+        executor: ExecutorLike | None = None,
     ) -> Callable[[SearchHandlerCallback], SearchHandler]:
         """A decorator that registers a search handler.
 
@@ -374,6 +759,12 @@ class Plugin(Generic[SettingsT]):
             A kwarg to quickly add a :class:`~flogin.conditions.PlainTextCondition`. If given, this should be the only argument given.
         pattern: Optional[:class:`re.Pattern`]
             A kwarg to quickly add a :class:`~flogin.conditions.RegexCondition`. If given, this should be the only argument given.
+        deadline: Optional[:class:`float`]
+            The handler's :attr:`~flogin.search_handler.SearchHandler.deadline`. Can be given with any of the other arguments.
+        incremental: Optional[:class:`bool`]
+            Whether or not to create an :class:`~flogin.search_handler.IncrementalSearchHandler`, in which case the decorated function is used as :func:`~flogin.search_handler.IncrementalSearchHandler.search`, and takes the candidates as its second argument. Can be given with any of the other arguments. Defaults to ``False``
+        executor: Optional[Literal["thread", "process"] | :class:`concurrent.futures.Executor`]
+            The handler's :attr:`~flogin.search_handler.SearchHandler.executor`, in which case the decorated function must be a regular function or generator. Can be given with any of the other arguments, except for ``incremental``.
 
         Example
         ---------
@@ -392,9 +783,16 @@ class Plugin(Generic[SettingsT]):
             elif pattern is not MISSING:
                 condition = RegexCondition(pattern)
 
+        if incremental and executor is not None:
+            raise TypeError("'incremental' and 'executor' can not be passed together")
+
         def inner(func: SearchHandlerCallback) -> SearchHandler:
-            handler = SearchHandler(condition)
-            handler.callback = func  # type: ignore # type is the same
+            if incremental:
+                handler = IncrementalSearchHandler(condition, deadline=deadline)
+                handler.search = func  # type: ignore
+            else:
+                handler = SearchHandler(condition, deadline=deadline, executor=executor)
+                handler.callback = func  # type: ignore # type is the same
             self.register_search_handler(handler)
             return handler
 
@@ -403,6 +801,8 @@ class Plugin(Generic[SettingsT]):
     def fetch_flow_settings(self) -> FlowSettings:
         """Fetches flow's settings from flow's config file
 
+        If the search precision changed since it was last seen, the cache of :func:`~flogin.flow.api.FlowLauncherAPI.fuzzy_search` is cleared.
+
         Returns
         --------
         :class:`~flogin.flow.settings.FlowSettings`
@@ -412,4 +812,9 @@ class Plugin(Generic[SettingsT]):
         path = os.path.join("..", "..", "Settings", "Settings.json")
         with open(path, "r") as f:
             data = json.load(f)
-        return FlowSettings(data)
+        settings = FlowSettings(data)
+
+        # the api is replaced while testing
+        if isinstance(self.api, FlowLauncherAPI):
+            self.api._set_search_precision(settings.query_search_precision.value)
+        return settings
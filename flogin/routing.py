@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import logging
+import re
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from .conditions import KeywordCondition, PlainTextCondition, RegexCondition
+
+if TYPE_CHECKING:
+    from .query import Query
+    from .search_handler import SearchHandler
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ("SearchHandlerRouter",)
+
+_INDEXABLE_KEYWORDS = (list, tuple, set, frozenset)
+_COMBINABLE_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.UNICODE
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+_GROUP_REFERENCE = re.compile(r"\\(?:[1-9]|g<)|\(\?\(")
+
+
+def _combinable_source(index: int, pattern: Any) -> str | None:
+    if not isinstance(pattern, re.Pattern) or not isinstance(pattern.pattern, str):
+        return None
+    # group numbers shift once the pattern is part of a bigger one, and group names could clash,
+    # so anything that refers to a group is checked on its own
+    if pattern.groupindex or pattern.flags & ~_COMBINABLE_FLAGS:
+        return None
+    if _GROUP_REFERENCE.search(pattern.pattern):
+        return None
+
+    flags = "".join(char for flag, char in _SCOPED_FLAGS if pattern.flags & flag)
+    source = (
+        f"(?P<_r{index}>(?{flags}:{pattern.pattern}))"
+        if flags
+        else f"(?P<_r{index}>{pattern.pattern})"
+    )
+
+    try:
+        # global inline flags such as ``(?i)`` can not be used inside of a group
+        re.compile(source)
+    except re.error:
+        return None
+    return source
+
+
+class SearchHandlerRouter:
+    r"""Finds the search handlers whose conditions match a query, without calling every condition.
+
+    Handlers with a :class:`~flogin.conditions.PlainTextCondition` are indexed by their text, and handlers with a :class:`~flogin.conditions.KeywordCondition` that has ``allowed_keywords`` are indexed by each keyword. The patterns of handlers with a :class:`~flogin.conditions.RegexCondition` are combined into a single pattern, so one match finds the first regex handler that matches, and only that handler's own condition is called to give it its :class:`re.Match`. Patterns that can not be safely combined, such as ones with named groups or backreferences, are checked on their own. Only the conditions of the remaining handlers are called. Matches are always produced in registration order, exactly as if every condition was checked one by one.
+
+    .. NOTE::
+        Do not initialize this class yourself, :class:`~flogin.plugin.Plugin` creates one and uses it whenever a search handler is registered.
+
+    .. WARNING::
+        Conditions are indexed when their handler is registered, so changing a handler's condition (or the text or keywords of a builtin condition) afterwards is not picked up.
+
+    Attributes
+    ----------
+    handlers: list[:class:`~flogin.search_handler.SearchHandler`]
+        Every registered handler, in registration order
+    """
+
+    __slots__ = (
+        "handlers",
+        "_text",
+        "_keywords",
+        "_dynamic",
+        "_is_dynamic",
+        "_regex",
+        "_regex_sources",
+        "_combined",
+    )
+
+    def __init__(self) -> None:
+        self.handlers: list[SearchHandler[Any]] = []
+        self._text: defaultdict[str, list[int]] = defaultdict(list)
+        self._keywords: defaultdict[str, list[int]] = defaultdict(list)
+        self._dynamic: list[int] = []
+        self._is_dynamic: list[bool] = []
+        self._regex: list[int] = []
+        self._regex_sources: list[str] = []
+        self._combined: re.Pattern[str] | None = None
+
+    def add(self, handler: SearchHandler[Any]) -> None:
+        r"""Adds a handler to the end of the routing table.
+
+        Parameters
+        ----------
+        handler: :class:`~flogin.search_handler.SearchHandler`
+            The handler
+        """
+
+        index = len(self.handlers)
+        self.handlers.append(handler)
+        self._is_dynamic.append(False)
+        condition = handler.condition
+
+        # subclasses could override __call__, so only the exact builtin types are indexed
+        if type(condition) is PlainTextCondition:
+            self._text[condition.text].append(index)
+        elif (
+            type(condition) is KeywordCondition
+            and isinstance(condition.allowed_keywords, _INDEXABLE_KEYWORDS)
+            and condition.disallowed_keywords is None
+        ):
+            for keyword in set(condition.allowed_keywords):
+                self._keywords[keyword].append(index)
+        else:
+            self._is_dynamic[index] = True
+            source = (
+                _combinable_source(index, condition.pattern)
+                if type(condition) is RegexCondition
+                else None
+            )
+
+            if source is None:
+                self._dynamic.append(index)
+            else:
+                self._regex.append(index)
+                self._regex_sources.append(source)
+                self._combined = None
+
+    def candidates(self, query: Query) -> Iterator[tuple[int, bool]]:
+        r"""Yields the indexes of every handler that might match the query, in registration order.
+
+        Parameters
+        ----------
+        query: :class:`~flogin.query.Query`
+            The query
+
+        Yields
+        ------
+        tuple[:class:`int`, :class:`bool`]
+            The index of the handler in :attr:`handlers`, and whether or not its condition still has to be called
+        """
+
+        streams: list[Iterable[int]] = [
+            stream
+            for stream in (
+                self._text.get(query.text, ()),
+                self._keywords.get(query.keyword, ()),
+            )
+            if stream
+        ]
+        if self._regex:
+            streams.append(self._regex_candidates(query))
+
+        if not streams:
+            for index in self._dynamic:
+                yield index, True
+            return
+
+        is_dynamic = self._is_dynamic
+        for index in heapq.merge(*streams, self._dynamic):
+            yield index, is_dynamic[index]
+
+    @property
+    def combined_pattern(self) -> re.Pattern[str] | None:
+        """Optional[:class:`re.Pattern`]: The pattern that all combinable :class:`~flogin.conditions.RegexCondition` patterns were merged into, or ``None`` if there are none. It is rebuilt the next time it is needed after a regex handler is added."""
+
+        if self._combined is None and self._regex:
+            self._combined = re.compile("|".join(self._regex_sources))
+            LOG.debug(f"Combined {len(self._regex)} regex conditions into one pattern")
+        return self._combined
+
+    def _regex_candidates(self, query: Query) -> Iterator[int]:
+        match = self.combined_pattern.match(query.text)  # type: ignore
+        if match is None:
+            return
+
+        # alternatives are tried in order, so none of the patterns before the one that matched can match.
+        # the wrapping group of each pattern closes last, so it is always ``lastgroup``
+        first = int(match.lastgroup[2:])  # type: ignore
+        regex = self._regex
+        yield from itertools.islice(regex, bisect.bisect_left(regex, first), None)
+
+    def route(self, query: Query) -> Iterator[SearchHandler[Any]]:
+        r"""Yields every handler whose condition matches the query, in registration order.
+
+        Conditions are only called when the previous match has been consumed, so stopping after the first handler behaves the same as checking each condition in order until one matches.
+
+        Parameters
+        ----------
+        query: :class:`~flogin.query.Query`
+            The query
+
+        Yields
+        ------
+        :class:`~flogin.search_handler.SearchHandler`
+        """
+
+        handlers = self.handlers
+        for index, dynamic in self.candidates(query):
+            handler = handlers[index]
+            if not dynamic or handler.condition(query):
+                yield handler
+
+    def __len__(self) -> int:
+        return len(self.handlers)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} handlers={len(self.handlers)} text={len(self._text)} keywords={len(self._keywords)} dynamic={len(self._dynamic)} regex={len(self._regex)}>"
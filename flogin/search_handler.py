@@ -1,23 +1,31 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Callable, Generic, TypeVar
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Generic, Literal, TypeVar
 
 from ._types import PluginT, SearchHandlerCallbackReturns, SearchHandlerCondition
 from .jsonrpc import ErrorResponse
-from .utils import copy_doc
+from .utils import copy_doc, coro_or_gen
 
 if TYPE_CHECKING:
+    from .jsonrpc.results import Result
     from .query import Query
 
     ErrorHandlerT = TypeVar(
         "ErrorHandlerT",
         bound=Callable[[Query, Exception], SearchHandlerCallbackReturns],
     )
+    DeadlineHandlerT = TypeVar(
+        "DeadlineHandlerT",
+        bound=Callable[[Query, list[Result]], Coroutine[Any, Any, Any]],
+    )
 
 LOG = logging.getLogger(__name__)
 
-__all__ = ("SearchHandler",)
+__all__ = ("SearchHandler", "IncrementalSearchHandler")
+
+ExecutorLike = Literal["thread", "process"] | Executor
 
 
 def _default_condition(q: Query) -> bool:
@@ -41,16 +49,32 @@ class SearchHandler(Generic[PluginT]):
         A function which is used to determine if this search handler should be used to handle a given query or not
     plugin: :class:`~flogin.plugin.Plugin` | None
         Your plugin instance. This is filled before :func:`~flogin.search_handler.SearchHandler.callback` is triggered.
+    deadline: :class:`float` | None
+        The max amount of seconds that :func:`~flogin.search_handler.SearchHandler.callback` can run for. Once it is exceeded, the callback is cancelled, the results that it already yielded are sent, and :func:`~flogin.search_handler.SearchHandler.on_deadline_exceeded` is triggered. Handlers with a deadline are not streamed. ``None`` means no deadline.
+    executor: Literal["thread", "process"] | :class:`concurrent.futures.Executor` | None
+        If given, :func:`~flogin.search_handler.SearchHandler.callback` must be a regular function or generator instead of a coroutine, and it is ran in this executor so that blocking or CPU-bound work does not stall the plugin. ``"thread"`` and ``"process"`` use pools that are managed by :class:`~flogin.plugin.Plugin`, see its ``max_thread_workers`` and ``max_process_workers`` options. If the handler is cancelled before the callback starts, it never runs, and if it is cancelled while the callback is running, its results are discarded.
+
+        .. NOTE::
+            With a process pool, the callback gets a copy of the query without :attr:`~flogin.query.Query.plugin`. The callback, the query's :attr:`~flogin.query.Query.condition_data`, and whatever the callback returns must be picklable, so define the callback at the module level and register it without rebinding its name, for example with ``plugin.search(executor="process")(callback)``. The :class:`re.Match` objects that :class:`~flogin.conditions.RegexCondition` gives can not be pickled.
     """
 
     def __init__(
         self,
         condition: SearchHandlerCondition | None = None,
+        *,
+        deadline: float | None = None,
+        executor: ExecutorLike | None = None,
     ) -> None:
         if condition is None:
             condition = _default_condition
+        if isinstance(executor, str) and executor not in ("thread", "process"):
+            raise ValueError(
+                f"executor must be 'thread', 'process' or an Executor, not {executor!r}"
+            )
 
         self.condition = condition
+        self.deadline = deadline
+        self.executor = executor
         self.plugin: PluginT | None = None
 
     def callback(self, query: Query) -> SearchHandlerCallbackReturns:
@@ -102,6 +126,23 @@ class SearchHandler(Generic[PluginT]):
         """
         ...
 
+    async def on_deadline_exceeded(self, query: Query, results: list[Result]) -> None:
+        r"""|coro|
+
+        Override this function to add behavior for when this handler's callback exceeds its :attr:`~flogin.search_handler.SearchHandler.deadline`. By default, a warning is logged.
+
+        Parameters
+        ----------
+        query: :class:`~flogin.query.Query`
+            The query that was being handled when the deadline was exceeded.
+        results: list[:class:`~flogin.jsonrpc.results.Result`]
+            The results that the callback yielded before the deadline, which will be sent to flow.
+        """
+
+        LOG.warning(
+            f"Search handler {self.name} exceeded its deadline of {self.deadline} seconds, sending {len(results)} results"
+        )
+
     if not TYPE_CHECKING:
 
         @copy_doc(callback)
@@ -142,3 +183,137 @@ class SearchHandler(Generic[PluginT]):
 
         self.on_error = func  # type: ignore
         return func
+
+    def deadline_exceeded(self, func: DeadlineHandlerT) -> DeadlineHandlerT:
+        """A decorator that registers a deadline handler for this search handler.
+
+        For more information see :class:`~flogin.search_handler.SearchHandler.on_deadline_exceeded`
+
+        Example
+        ---------
+
+        .. code-block:: python3
+
+            @plugin.search(deadline=0.5)
+            async def my_hander(query):
+                ..
+
+            @my_handler.deadline_exceeded
+            async def my_deadline_handler(query, results):
+                ...
+
+        """
+
+        self.on_deadline_exceeded = func  # type: ignore
+        return func
+
+
+class IncrementalSearchHandler(SearchHandler[PluginT]):
+    r"""A search handler that narrows down the candidates of the previous query, instead of searching from scratch on every keystroke.
+
+    The candidates that :func:`~flogin.search_handler.IncrementalSearchHandler.search` returns are kept for each keyword. When the text of the next query with the same keyword starts with the text of the previous one, for example ``foob`` after ``foo``, those candidates are passed to :func:`~flogin.search_handler.IncrementalSearchHandler.search` so it only has to filter them. Otherwise, such as after a backspace or an unrelated edit, the kept candidates are dropped and ``None`` is passed.
+
+    .. NOTE::
+        This only gives correct results if every candidate that matches a text also matches every shorter prefix of that text, which is the case for substring and subsequence matching. Return every candidate that matches from :func:`~flogin.search_handler.IncrementalSearchHandler.search`, and limit or sort what is shown in :func:`~flogin.search_handler.IncrementalSearchHandler.to_results` instead.
+
+    The :func:`~flogin.plugin.Plugin.search` decorator creates one of these when ``incremental=True`` is passed.
+
+    Example
+    -------
+    .. code-block:: python3
+
+        @plugin.search(incremental=True)
+        async def handler(query, candidates):
+            if candidates is None:
+                candidates = await load_everything()
+            return [item for item in candidates if query.text in item]
+    """
+
+    def __init__(
+        self,
+        condition: SearchHandlerCondition | None = None,
+        *,
+        deadline: float | None = None,
+    ) -> None:
+        super().__init__(condition, deadline=deadline)
+        self._candidates: dict[str, tuple[str, list[Any]]] = {}
+
+    async def search(self, query: Query, candidates: list[Any] | None) -> Any:
+        r"""|coro|
+
+        Override this function to search for, or narrow down, the candidates for a query.
+
+        Parameters
+        ----------
+        query: :class:`~flogin.query.Query`
+            The query
+        candidates: list[Any] | None
+            The candidates of the previous query, if this query's text extends the previous query's text. ``None`` means a full search is needed.
+
+        Returns
+        -------
+        list[Any]
+            Every candidate that matches the query.
+
+        Yields
+        ------
+        Any
+            A candidate that matches the query.
+        """
+
+        raise RuntimeError("Search was not overriden")
+
+    async def to_results(self, query: Query, candidates: list[Any]) -> Any:
+        r"""|coro|
+
+        Override this function to change which of the candidates are sent to flow, for example to sort or limit them. By default, every candidate is sent.
+
+        Parameters
+        ----------
+        query: :class:`~flogin.query.Query`
+            The query
+        candidates: list[Any]
+            Every candidate that matches the query
+
+        Returns
+        -------
+        list[:class:`~flogin.jsonrpc.results.Result`] | :class:`~flogin.jsonrpc.results.Result` | str | Any
+            A list of results, an results, or something that can be converted into a list of results.
+        """
+
+        return candidates
+
+    @property
+    def name(self) -> str:
+        """:class:`str`: The name of the search handler's :func:`~flogin.search_handler.IncrementalSearchHandler.search` function"""
+        return self.search.__name__
+
+    def invalidate(self, keyword: str | None = None) -> None:
+        r"""Drops the kept candidates, so that the next query does a full search. Call this when the data that is being searched changes.
+
+        Parameters
+        ----------
+        keyword: Optional[:class:`str`]
+            Only drop the candidates of this keyword. Defaults to every keyword.
+        """
+
+        if keyword is None:
+            self._candidates.clear()
+        else:
+            self._candidates.pop(keyword, None)
+
+    async def callback(self, query: Query) -> Any:  # type: ignore
+        # popped right away, so a failed or cancelled search never leaves stale candidates behind
+        previous = self._candidates.pop(query.keyword, None)
+        candidates = None
+        if previous is not None and query.text.startswith(previous[0]):
+            candidates = previous[1]
+
+        found = await coro_or_gen(self.search(query, candidates))
+        if found is None:
+            found = []
+        elif not isinstance(found, list):
+            found = [found]
+
+        self._candidates[query.keyword] = (query.text, found)
+        return await self.to_results(query, found)
@@ -1,6 +1,8 @@
+import asyncio
 import functools
 import logging
 import logging.handlers
+import time
 from functools import _make_key as make_cached_key
 from inspect import isasyncgen, iscoroutine
 from inspect import signature as _signature
@@ -13,8 +15,11 @@ from typing import (
     Callable,
     Coroutine,
     TypeVar,
+    overload,
 )
 
+from .caching import AsyncCache, EvictionPolicy
+
 Coro = TypeVar("Coro", bound=Callable[..., Coroutine[Any, Any, Any]])
 AGenT = TypeVar("AGenT", bound=Callable[..., AsyncGenerator[Any, Any]])
 T = TypeVar("T")
@@ -49,6 +54,7 @@ __all__ = (
     "cached_property",
     "cached_coro",
     "cached_gen",
+    "stale_while_revalidate",
 )
 
 
@@ -77,12 +83,54 @@ class _MissingSentinel:
 MISSING: Any = _MissingSentinel()
 
 
-def cached_coro(coro: Coro) -> Coro:
+def _cache_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    return make_cached_key(args, kwargs, False)
+
+
+def _attach_cache(inner: Any, cache: AsyncCache) -> None:
+    inner.cache = cache
+    inner.invalidate = lambda *args, **kwargs: cache.invalidate(
+        _cache_key(args, kwargs)
+    )
+
+
+@overload
+def cached_coro(coro: Coro, /) -> Coro: ...
+
+
+@overload
+def cached_coro(
+    *,
+    max_size: int | None = ...,
+    ttl: float | None = ...,
+    policy: EvictionPolicy = ...,
+) -> Callable[[Coro], Coro]: ...
+
+
+def cached_coro(
+    coro: Coro | None = None,
+    /,
+    *,
+    max_size: int | None = 128,
+    ttl: float | None = None,
+    policy: EvictionPolicy = "lru",
+) -> Coro | Callable[[Coro], Coro]:
     r"""A decorator to cache a coro's contents based on the passed arguments. This is provided to cache search results.
 
+    Concurrent calls with the same arguments share a single call of the coro, and exceptions are not cached. The :class:`~flogin.caching.AsyncCache` that is used can be accessed with the ``cache`` attribute of the decorated coro, and ``invalidate(*args, **kwargs)`` removes the entry for the given arguments.
+
     .. NOTE::
         The arguments passed to the coro must be hashable.
 
+    Parameters
+    ----------
+    max_size: :class:`int` | None
+        The max amount of entries to keep. ``None`` means unlimited. Defaults to ``128``
+    ttl: :class:`float` | None
+        The amount of seconds that an entry is valid for. ``None`` means forever. Defaults to ``None``
+    policy: Literal["lru", "lfu"]
+        Which entry to remove once the cache is full. Defaults to ``"lru"``
+
     Example
     --------
     .. code-block:: python3
@@ -91,28 +139,67 @@ def cached_coro(coro: Coro) -> Coro:
         @utils.cached_coro
         async def handler(query):
             ...
+
+        @plugin.search()
+        @utils.cached_coro(max_size=512, ttl=60)
+        async def handler(query):
+            ...
     """
 
-    cache = {}
+    def decorator(coro: Coro) -> Coro:
+        cache = AsyncCache(max_size=max_size, ttl=ttl, policy=policy)
+
+        @functools.wraps(coro)
+        async def inner(*args, **kwargs):
+            return await cache.get_or_compute(
+                _cache_key(args, kwargs), lambda: coro_or_gen(coro(*args, **kwargs))
+            )
+
+        _attach_cache(inner, cache)
+        return inner  # type: ignore
+
+    if coro is None:
+        return decorator
+    return decorator(coro)
+
+
+@overload
+def cached_gen(gen: AGenT, /) -> AGenT: ...
 
-    @functools.wraps(coro)
-    async def inner(*args, **kwargs):
-        key = make_cached_key(args, kwargs, False)
-        try:
-            return cache[key]
-        except KeyError:
-            cache[key] = await coro_or_gen(coro(*args, **kwargs))
-            return cache[key]
 
-    return inner  # type: ignore
+@overload
+def cached_gen(
+    *,
+    max_size: int | None = ...,
+    ttl: float | None = ...,
+    policy: EvictionPolicy = ...,
+) -> Callable[[AGenT], AGenT]: ...
 
 
-def cached_gen(gen: AGenT) -> AGenT:
+def cached_gen(
+    gen: AGenT | None = None,
+    /,
+    *,
+    max_size: int | None = 128,
+    ttl: float | None = None,
+    policy: EvictionPolicy = "lru",
+) -> AGenT | Callable[[AGenT], AGenT]:
     r"""A decorator to cache an async generator's contents based on the passed arguments. This is provided to cache search results.
 
+    Concurrent calls with the same arguments share a single run of the generator, and exceptions are not cached. The :class:`~flogin.caching.AsyncCache` that is used can be accessed with the ``cache`` attribute of the decorated generator, and ``invalidate(*args, **kwargs)`` removes the entry for the given arguments.
+
     .. NOTE::
         The arguments passed to the generator must be hashable.
 
+    Parameters
+    ----------
+    max_size: :class:`int` | None
+        The max amount of entries to keep. ``None`` means unlimited. Defaults to ``128``
+    ttl: :class:`float` | None
+        The amount of seconds that an entry is valid for. ``None`` means forever. Defaults to ``None``
+    policy: Literal["lru", "lfu"]
+        Which entry to remove once the cache is full. Defaults to ``"lru"``
+
     Example
     --------
     .. code-block:: python3
@@ -121,22 +208,141 @@ def cached_gen(gen: AGenT) -> AGenT:
         @utils.cached_gen
         async def handler(query):
             ...
+
+        @plugin.search()
+        @utils.cached_gen(ttl=60, policy="lfu")
+        async def handler(query):
+            ...
     """
 
-    cache = {}
+    def decorator(gen: AGenT) -> AGenT:
+        cache = AsyncCache(max_size=max_size, ttl=ttl, policy=policy)
 
-    @functools.wraps(gen)
-    async def inner(*args, **kwargs):
-        key = make_cached_key(args, kwargs, False)
-        try:
-            for item in cache[key]:
-                yield item
-        except KeyError:
-            cache[key] = await coro_or_gen(gen(*args, **kwargs))
-            for item in cache[key]:
+        @functools.wraps(gen)
+        async def inner(*args, **kwargs):
+            items = await cache.get_or_compute(
+                _cache_key(args, kwargs), lambda: coro_or_gen(gen(*args, **kwargs))
+            )
+            for item in items:
                 yield item
 
-    return inner  # type: ignore
+        _attach_cache(inner, cache)
+        return inner  # type: ignore
+
+    if gen is None:
+        return decorator
+    return decorator(gen)
+
+
+@overload
+def stale_while_revalidate(coro: Coro, /) -> Coro: ...
+
+
+@overload
+def stale_while_revalidate(
+    *,
+    max_age: float = ...,
+    max_size: int | None = ...,
+    ttl: float | None = ...,
+    policy: EvictionPolicy = ...,
+) -> Callable[[Coro], Coro]: ...
+
+
+def stale_while_revalidate(
+    coro: Coro | None = None,
+    /,
+    *,
+    max_age: float = 0,
+    max_size: int | None = 128,
+    ttl: float | None = None,
+    policy: EvictionPolicy = "lru",
+) -> Coro | Callable[[Coro], Coro]:
+    r"""A decorator for search handlers backed by slow sources, which returns cached results right away and refreshes them in the background.
+
+    The first call with a set of arguments waits for the results, the same way as :func:`~flogin.utils.cached_coro`. After that, the cached results are returned right away, and if they are older than ``max_age``, the search handler is ran again in the background. Once the fresh results arrive, they are cached and sent to flow with :func:`~flogin.query.Query.update_results`, but only if no newer query has been received in the meantime.
+
+    This works with search handlers that are coroutines or async generators, and turns them into a coroutine. Concurrent refreshes of the same arguments share a single call.
+
+    .. NOTE::
+        The arguments passed to the search handler must be hashable, and one of them must be the :class:`~flogin.query.Query` for fresh results to be sent.
+
+    Parameters
+    ----------
+    max_age: :class:`float`
+        The amount of seconds that cached results are considered fresh for, and are returned without being refreshed. Defaults to ``0``, which refreshes them every time.
+    max_size: :class:`int` | None
+        The max amount of entries to keep. ``None`` means unlimited. Defaults to ``128``
+    ttl: :class:`float` | None
+        The amount of seconds after which an entry is removed, instead of being returned while it is refreshed. ``None`` means never. Defaults to ``None``
+    policy: Literal["lru", "lfu"]
+        Which entry to remove once the cache is full. Defaults to ``"lru"``
+
+    Example
+    --------
+    .. code-block:: python3
+
+        @plugin.search()
+        @utils.stale_while_revalidate(max_age=30)
+        async def handler(query):
+            ...
+    """
+
+    from .query import Query  # circular import
+
+    def decorator(coro: Coro) -> Coro:
+        cache: AsyncCache[tuple[float, Any]] = AsyncCache(
+            max_size=max_size, ttl=ttl, policy=policy
+        )
+        pushes: set[asyncio.Task[None]] = set()
+
+        async def push(query: Query, generation: int, raw_results: Any) -> None:
+            if query.plugin._query_generation != generation:
+                LOG.debug(f"Not sending refreshed results of outdated query {query!r}")
+                return
+
+            results = query.plugin._convert_results(raw_results)
+            if isinstance(results, list):
+                await query.update_results(results)
+
+        def on_refreshed(
+            query: Query, generation: int, task: asyncio.Future[tuple[float, Any]]
+        ) -> None:
+            if task.cancelled() or task.exception() is not None:
+                return
+
+            pushed = asyncio.create_task(push(query, generation, task.result()[1]))
+            pushes.add(pushed)
+            pushed.add_done_callback(pushes.discard)
+
+        @functools.wraps(coro)
+        async def inner(*args, **kwargs):
+            key = _cache_key(args, kwargs)
+
+            async def compute() -> tuple[float, Any]:
+                return time.monotonic(), await coro_or_gen(coro(*args, **kwargs))
+
+            entry = cache.get(key, MISSING)
+            if entry is MISSING:
+                return (await cache.get_or_compute(key, compute))[1]
+
+            created, value = entry
+            if time.monotonic() - created >= max_age:
+                task = cache.refresh(key, compute)
+                query = next((arg for arg in args if isinstance(arg, Query)), None)
+                if query is not None and query.plugin is not None:
+                    task.add_done_callback(
+                        functools.partial(
+                            on_refreshed, query, query.plugin._query_generation
+                        )
+                    )
+            return value
+
+        _attach_cache(inner, cache)
+        return inner  # type: ignore
+
+    if coro is None:
+        return decorator
+    return decorator(coro)
 
 
 def setup_logging(
@@ -195,6 +401,10 @@ async def coro_or_gen(coro: Awaitable[T] | AsyncIterable[T]) -> list[T] | T:
     if iscoroutine(coro):
         return await coro
     elif isasyncgen(coro):
-        return [item async for item in coro]
+        try:
+            return [item async for item in coro]
+        finally:
+            # close the generator right away if we were cancelled, instead of when it gets garbage collected
+            await coro.aclose()
     else:
         raise TypeError(f"Not a coro or gen: {coro!r}")
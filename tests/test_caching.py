@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from flogin.caching import AsyncCache
+from flogin.utils import cached_coro, cached_gen
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_computation():
+    calls = 0
+
+    @cached_coro
+    async def compute(value: int):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    results = await asyncio.gather(*(compute(2) for _ in range(10)))
+    assert results == [4] * 10
+    assert calls == 1
+    assert await compute(2) == 4
+    assert calls == 1
+
+    stats = compute.cache.stats()  # type: ignore
+    assert (stats.hits, stats.misses, stats.deduplicated) == (1, 10, 9)
+
+
+@pytest.mark.asyncio
+async def test_cached_gen_with_options():
+    calls = 0
+
+    @cached_gen(max_size=1)
+    async def gen(value: str):
+        nonlocal calls
+        calls += 1
+        yield value
+        yield value.upper()
+
+    assert [item async for item in gen("a")] == ["a", "A"]
+    assert [item async for item in gen("a")] == ["a", "A"]
+    assert calls == 1
+
+    assert [item async for item in gen("b")] == ["b", "B"]
+    assert [item async for item in gen("a")] == ["a", "A"]
+    assert calls == 3
+    assert gen.cache.stats().evicted == 2  # type: ignore
+
+    assert gen.invalidate("a")  # type: ignore
+    assert not gen.invalidate("a")  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_not_cached():
+    calls = 0
+
+    @cached_coro
+    async def fail():
+        nonlocal calls
+        calls += 1
+        raise ValueError
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await fail()
+    assert calls == 2
+    assert len(fail.cache) == 0  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_cancelling_every_waiter_cancels_the_computation():
+    cache = AsyncCache()
+    cancelled = asyncio.Event()
+
+    async def compute():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiters = [
+        asyncio.create_task(cache.get_or_compute("key", compute)) for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    waiters[0].cancel()
+    await asyncio.sleep(0)
+    assert not cancelled.is_set()
+
+    waiters[1].cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert "key" not in cache
+
+
+def test_lfu_eviction():
+    cache = AsyncCache(max_size=2, policy="lfu")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = 100.0
+    monkeypatch.setattr("flogin.caching.time.monotonic", lambda: now)
+    cache = AsyncCache(ttl=10)
+    cache.set("a", 1)
+
+    now += 5
+    assert cache.get("a") == 1
+    now += 5
+    assert cache.get("a") is None
+    assert cache.stats().expired == 1
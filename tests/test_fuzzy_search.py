@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from flogin.flow import SearchPrecisionScore
+from flogin.flow.api import FlowLauncherAPI
+from flogin.flow.fuzzy_search import could_match, fuzzy_match
+
+
+@pytest.mark.parametrize(
+    ("query", "text", "score", "highlight_data"),
+    [
+        ("chr", "Google Chrome", 110, [7, 8, 9]),
+        ("gc", "Google Chrome", 100, [0, 7]),
+        ("vs", "Visual Studio Code", 66, [0, 7]),
+        ("world", "hello world", 140, [6, 7, 8, 9, 10]),
+        ("stu cod", "Visual Studio Code", 116, [7, 8, 9, 14, 15, 16]),
+        ("setings", "Settings", 100, [0, 1, 2, 4, 5, 6, 7]),
+    ],
+)
+def test_fuzzy_match_scores(
+    query: str, text: str, score: int, highlight_data: list[int]
+):
+    result = fuzzy_match(query, text)
+    assert result.success
+    assert result.score == result.raw_score == score
+    assert result.highlight_data == highlight_data
+    assert result.search_precision == SearchPrecisionScore.regular.value
+
+
+@pytest.mark.parametrize(
+    ("query", "text"), [("xyz", "Google Chrome"), ("", "Google Chrome"), ("a", "")]
+)
+def test_fuzzy_match_no_match(query: str, text: str):
+    result = fuzzy_match(query, text)
+    assert not result.success
+    assert result.score == 0
+    assert result.highlight_data == []
+
+
+def test_fuzzy_match_precision():
+    result = fuzzy_match("ee", "Google Chrome", precision=80)
+    assert result.success
+    assert (result.raw_score, result.score) == (20, 0)
+
+    result = fuzzy_match("ee", "Google Chrome", precision=SearchPrecisionScore.low)
+    assert result.score == 20
+
+
+@pytest.mark.parametrize(
+    ("query", "text", "expected"),
+    [
+        ("chr", "Google Chrome", True),
+        ("g c", "Google Chrome", True),
+        ("rc", "Chrome", False),
+    ],
+)
+def test_could_match(query: str, text: str, expected: bool):
+    assert could_match(query, text) is expected
+
+
+class FakeFuzzyAPI(FlowLauncherAPI):
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fuzzy_search(self, text: str, text_to_compare_it_to: str, *, timeout=None):  # type: ignore
+        self.sent.append(text_to_compare_it_to)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01 * (len(text_to_compare_it_to) % 3))
+            if text_to_compare_it_to == "boom":
+                raise RuntimeError
+            return fuzzy_match(text, text_to_compare_it_to)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_many():
+    api = FakeFuzzyAPI()
+    candidates = [f"chrome {index}" for index in range(20)] + ["xyz", "Google Chrome"]
+    results = await api.fuzzy_search_many("chr", candidates, max_in_flight=4)
+
+    assert api.max_in_flight == 4
+    assert "xyz" not in api.sent
+    assert len(api.sent) == 21
+    assert [result.score for result in results] == [
+        fuzzy_match("chr", candidate).score for candidate in candidates
+    ]
+    assert not results[20].success
+    assert results[20].search_precision == SearchPrecisionScore.regular.value
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_many_without_prefilter():
+    api = FakeFuzzyAPI()
+    results = await api.fuzzy_search_many("chr", ["xyz", "Chrome"], prefilter=False)
+
+    assert sorted(api.sent) == ["Chrome", "xyz"]
+    assert [result.success for result in results] == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_many_error():
+    api = FakeFuzzyAPI()
+    with pytest.raises(RuntimeError):
+        await api.fuzzy_search_many("o", ["boom", *["long text" * 5] * 10])
+    await asyncio.sleep(0.05)
+    assert api.in_flight == 0
+
+
+class FakeJsonRPC:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.precision = SearchPrecisionScore.regular
+
+    async def request(self, method: str, params: list[str], *, timeout=None):
+        self.requests += 1
+        await asyncio.sleep(0.01)
+        result = fuzzy_match(*params, precision=self.precision)
+        return {"result": result._data}
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_cache():
+    jsonrpc = FakeJsonRPC()
+    api = FlowLauncherAPI(jsonrpc)  # type: ignore
+
+    results = await asyncio.gather(
+        *(api.fuzzy_search("chr", "Google Chrome") for _ in range(5))
+    )
+    assert {result.score for result in results} == {110}
+    await api.fuzzy_search("chr", "Google Chrome")
+    assert jsonrpc.requests == 1
+
+    stats = api.fuzzy_search_cache.stats()  # type: ignore
+    assert (stats.hits, stats.misses) == (1, 5)
+    assert stats.hit_rate == pytest.approx(1 / 6)
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_cache_precision_change():
+    jsonrpc = FakeJsonRPC()
+    api = FlowLauncherAPI(jsonrpc)  # type: ignore
+
+    assert (await api.fuzzy_search("ee", "Google Chrome")).score == 0
+    await api.fuzzy_search("chr", "Google Chrome")
+
+    jsonrpc.precision = SearchPrecisionScore.low
+    await api.fuzzy_search("other", "text")
+    assert ("other", "text") in api.fuzzy_search_cache  # type: ignore
+    assert ("chr", "Google Chrome") not in api.fuzzy_search_cache  # type: ignore
+    assert (await api.fuzzy_search("ee", "Google Chrome")).score == 20
+    assert jsonrpc.requests == 4
+
+    api._set_search_precision(SearchPrecisionScore.regular.value)
+    assert len(api.fuzzy_search_cache) == 0  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_fuzzy_search_cache_disabled():
+    jsonrpc = FakeJsonRPC()
+    api = FlowLauncherAPI(jsonrpc, fuzzy_search_cache_size=0)  # type: ignore
+
+    await api.fuzzy_search("chr", "Google Chrome")
+    await api.fuzzy_search("chr", "Google Chrome")
+    assert api.fuzzy_search_cache is None
+    assert jsonrpc.requests == 2
@@ -0,0 +1,694 @@
+import asyncio
+import functools
+import os
+import weakref
+
+import pytest
+
+from flogin import (
+    ErrorResponse,
+    ExecuteResponse,
+    JsonRPCClient,
+    JsonRPCRequestTimeout,
+    Plugin,
+    QueryResponse,
+    Result,
+)
+from flogin.jsonrpc.admission import AdmissionController
+from flogin.jsonrpc.codec import JsonCodec, MsgspecCodec, OrjsonCodec
+from flogin.jsonrpc.errors import JsonRPCMessageTooLarge
+from flogin.jsonrpc.framing import LineFramer
+from flogin.jsonrpc.metrics import LatencyHistogram
+from flogin.jsonrpc.protocol import (
+    CancelRequested,
+    ErrorReceived,
+    InvalidMessage,
+    JsonRPCProtocol,
+    NotificationReceived,
+    RequestReceived,
+    ResultReceived,
+)
+from flogin.jsonrpc.registry import ResultRegistry
+from flogin.jsonrpc.requests import Request
+from flogin.jsonrpc.results import Glyph, ProgressBar, ResultPreview
+from flogin.jsonrpc.slugs import content_slug
+from flogin.jsonrpc.transports import create_memory_pipe, open_stdio_streams
+from flogin.jsonrpc.writer import BatchedWriter
+
+
+def _available_codecs():
+    codecs = [JsonCodec()]
+    for codec_cls in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(codec_cls())
+        except ImportError:
+            pass
+    return codecs
+
+
+@pytest.fixture(params=_available_codecs(), ids=lambda c: c.name)
+def codec(request: pytest.FixtureRequest) -> JsonCodec:
+    return request.param
+
+
+def test_codec_roundtrip(codec: JsonCodec):
+    data = {"method": "query", "params": [{"search": "héllo"}], "id": 5}
+    encoded = codec.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == data
+    assert codec.loads(memoryview(encoded)) == data
+
+
+def test_codec_non_str_keys(codec: JsonCodec):
+    assert codec.loads(codec.dumps({"a": {1: "x"}})) == {"a": {"1": "x"}}
+
+
+def test_codec_big_ints(codec: JsonCodec):
+    assert codec.loads(codec.dumps({"a": 2**70})) == {"a": 2**70}
+
+
+def test_codec_encode_message(codec: JsonCodec):
+    msg = codec.encode_message({"foo": "bar"})
+    assert msg.endswith(b"\r\n")
+    assert codec.loads(msg) == {"foo": "bar"}
+
+
+def test_query_response_to_message(codec: JsonCodec):
+    msg = QueryResponse([Result("Title")]).to_message(3, codec)
+    data = codec.loads(msg)
+    assert data["id"] == 3
+    assert data["jsonrpc"] == "2.0"
+    assert data["result"]["result"][0]["title"] == "Title"
+
+
+def test_execute_response_to_message(codec: JsonCodec):
+    msg = ExecuteResponse(hide=False).to_message(1, codec)
+    assert codec.loads(msg) == {"jsonrpc": "2.0", "result": {"hide": False}, "id": 1}
+
+
+def test_error_response_to_message(codec: JsonCodec):
+    msg = ErrorResponse.internal_error(TypeError("Boo")).to_message(1, codec)
+    assert codec.loads(msg)["result"]["data"] == "Boo"
+
+
+def test_request_to_message(codec: JsonCodec):
+    msg = Request("ShowMsg", 2, ["title"]).to_message(2, codec)
+    assert codec.loads(msg) == {
+        "method": "ShowMsg",
+        "id": 2,
+        "params": ["title"],
+        "jsonrpc": "2.0",
+    }
+
+
+def test_result_to_dict():
+    class NoCallbacks(Result):
+        callback = None  # type: ignore
+        context_menu = None  # type: ignore
+
+    result = Result(
+        "Title",
+        sub="Sub",
+        score=5,
+        preview=ResultPreview("image.png"),
+        progress_bar=ProgressBar(50),
+        glyph=Glyph("G", "Font"),
+    )
+    assert result.to_dict() == {
+        "title": "Title",
+        "subTitle": "Sub",
+        "jsonRPCAction": {"method": f"flogin.action.{result.slug}"},
+        "ContextData": [result.slug],
+        "score": 5,
+        "preview": {
+            "previewImagePath": "image.png",
+            "description": None,
+            "isMedia": True,
+        },
+        "ProgressBar": 50,
+        "ProgressBarColor": "#26a0da",
+        "Glyph": {"Glyph": "G", "FontFamily": "Font"},
+    }
+    assert NoCallbacks("Title").to_dict() == {"title": "Title"}
+    assert "to_dict" in NoCallbacks.__dict__
+
+
+def test_to_dict_overrides_are_kept():
+    class Custom(ExecuteResponse):
+        def to_dict(self) -> dict:
+            return {"custom": super().to_dict()}
+
+    class Child(Custom):
+        pass
+
+    assert Child(hide=False).to_dict() == {"custom": {"hide": False}}
+    assert Custom.to_dict is Child.to_dict
+
+
+def test_frozen_result_to_message(codec: JsonCodec):
+    results = [
+        Result("a").freeze(codec),
+        Result("b"),
+        Result("c"),
+        Result("d").freeze(),
+    ]
+    response = QueryResponse(results, {"key": 1}, "debug")
+    message = response.to_message(7, codec)
+
+    assert message.endswith(b"\r\n")
+    assert codec.loads(message) == {
+        "jsonrpc": "2.0",
+        "result": response.to_dict(),
+        "id": 7,
+    }
+    assert [item["title"] for item in codec.loads(message)["result"]["result"]] == [
+        "a",
+        "b",
+        "c",
+        "d",
+    ]
+
+
+def test_frozen_result_is_immutable():
+    result = Result("Title", sub="Sub")
+    slug = result.slug
+    assert result.freeze() is result
+    assert result.frozen and result.freeze() is result
+    assert type(result).__name__ == "Result"
+    assert isinstance(result, Result)
+    assert result.slug == slug
+
+    with pytest.raises(AttributeError):
+        result.title = "Other"
+    with pytest.raises(AttributeError):
+        del result.sub
+    assert result.to_dict()["title"] == "Title"
+
+    result.plugin = None
+    assert not Result("Title").frozen
+
+
+def test_result_sparse_fields():
+    result = Result("Title")
+    assert result._extras is None
+    assert result.copy_text is None
+
+    result.copy_text = "copy"
+    assert result._extras == {"copy_text": "copy"}
+    assert result.to_dict()["copyText"] == "copy"
+
+    result.copy_text = None
+    assert result._extras == {}
+    assert "copyText" not in result.to_dict()
+
+
+def test_result_attributes():
+    class Custom(Result):
+        def __init__(self, title: str, extra: int) -> None:
+            super().__init__(title)
+            self.extra = extra
+
+        @property
+        def glyph(self) -> Glyph:  # type: ignore
+            return Glyph(self.title, "Font")  # type: ignore
+
+        @property
+        def slug(self) -> str:  # type: ignore
+            return "fixed"
+
+    custom = Custom("Title", 5)
+    assert custom.extra == 5
+    assert custom.to_dict()["Glyph"] == {"Glyph": "Title", "FontFamily": "Font"}
+    assert custom.to_dict()["ContextData"] == ["fixed"]
+
+    async def callback():
+        pass
+
+    result = Result.create_with_partial(callback, title="Title")
+    assert result.callback is callback
+    assert weakref.ref(result)() is result
+
+    result.slug = "custom"
+    assert result.to_dict()["jsonRPCAction"] == {"method": "flogin.action.custom"}
+
+
+async def _wait(event: asyncio.Event):
+    await event.wait()
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_overflow():
+    admission = AdmissionController(default_limit=1, max_queued=10)
+    event = asyncio.Event()
+
+    for rid in range(3):
+        admission.submit("query", rid, lambda: _wait(event))
+
+    stats = admission.stats()["query"]
+    assert stats.in_flight == 1
+    assert stats.queued == 2
+    assert admission.queue_depth == 2
+
+    event.set()
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+    stats = admission.stats()["query"]
+    assert stats.in_flight == 0
+    assert stats.queued == 0
+    assert stats.admitted == 3
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_oldest_queued():
+    shed: list[int] = []
+
+    async def on_shed(rid: int):
+        shed.append(rid)
+
+    admission = AdmissionController(default_limit=1, max_queued=1, on_shed=on_shed)
+    event = asyncio.Event()
+
+    for rid in range(3):
+        admission.submit("query", rid, lambda: _wait(event))
+    await asyncio.sleep(0)
+
+    assert shed == [1]
+    assert admission.stats()["query"].shed == 1
+
+    assert admission.cancel(2) is True
+    assert admission.queue_depth == 0
+    event.set()
+
+
+@pytest.mark.asyncio
+async def test_admission_shed_mode():
+    admission = AdmissionController(default_limit=1, overflow="shed")
+    event = asyncio.Event()
+
+    admission.submit("query", 1, lambda: _wait(event))
+    admission.submit("query", 2, lambda: _wait(event))
+
+    stats = admission.stats()["query"]
+    assert stats.in_flight == 1
+    assert stats.queued == 0
+    assert stats.shed == 1
+    event.set()
+
+
+@pytest.mark.asyncio
+async def test_admission_groups_result_actions():
+    admission = AdmissionController(default_limit=None, limits={"flogin.action": 1})
+    event = asyncio.Event()
+
+    for rid in range(3):
+        admission.submit(f"flogin.action.slug{rid}", rid, lambda: _wait(event))
+
+    stats = admission.stats()
+    assert list(stats) == ["flogin.action"]
+    assert stats["flogin.action"].in_flight == 1
+    assert stats["flogin.action"].queued == 2
+    event.set()
+
+
+class FakeWriter:
+    def __init__(self):
+        self.written: list[bytes] = []
+
+    def write(self, data: bytes):
+        self.written.append(data)
+
+    def writelines(self, data: list[bytes]):
+        self.written.append(b"".join(data))
+
+    async def drain(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    client = Plugin().jsonrpc
+    client.writer = FakeWriter()  # type: ignore
+    return client
+
+
+@pytest.mark.asyncio
+async def test_request_timeout_cleans_up(client: JsonRPCClient):
+    with pytest.raises(JsonRPCRequestTimeout):
+        await client.request("ShowMainWindow", timeout=0.01)
+
+    assert client.pending_requests == 0
+    assert client.request_stats()["ShowMainWindow"].timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_request_ids_are_not_reused(client: JsonRPCClient):
+    await client.process_message(
+        {"jsonrpc": "2.0", "method": "unknown_method", "id": 1, "params": []}
+    )
+
+    task = asyncio.create_task(client.request("ShowMainWindow"))
+    await asyncio.sleep(0)
+    (rid,) = client.requests
+    await client.process_message({"jsonrpc": "2.0", "id": rid, "result": None})
+    await task
+
+    task = asyncio.create_task(client.request("ShowMainWindow"))
+    await asyncio.sleep(0)
+    assert list(client.requests) == [rid + 1]
+    await client.process_message({"jsonrpc": "2.0", "id": rid + 1, "result": None})
+    await task
+
+    stats = client.request_stats()["ShowMainWindow"]
+    assert stats.count == 2
+    assert stats.timeouts == 0
+    assert client.pending_requests == 0
+
+
+def test_latency_histogram():
+    hist = LatencyHistogram()
+    for seconds in (0.001, 0.002, 0.02, 0.3):
+        hist.observe(seconds)
+
+    assert hist.count == 4
+    assert hist.max == 0.3
+    assert hist.percentile(50) == 0.0025
+    assert hist.percentile(100) == 0.3
+
+
+@pytest.mark.asyncio
+async def test_batched_writer_coalesces():
+    writer = BatchedWriter(FakeWriter())  # type: ignore
+
+    for i in range(10):
+        await writer.write(b"%d\r\n" % i)
+    assert writer.flushes == 0
+
+    await asyncio.sleep(0)
+    assert writer.writer.written == [b"".join(b"%d\r\n" % i for i in range(10))]
+    assert writer.flushes == 1
+    assert writer.messages_written == 10
+    assert writer.bytes_written == 30
+    assert writer.drains == 0
+
+
+class ClosedWriter(FakeWriter):
+    def writelines(self, data: list[bytes]):
+        raise ConnectionResetError("closed")
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_fails_requests(client: JsonRPCClient):
+    client.writer = ClosedWriter()  # type: ignore
+
+    with pytest.raises(ConnectionResetError):
+        await asyncio.wait_for(client.request("ShowMainWindow"), 1)
+    assert client.pending_requests == 0
+
+
+@pytest.mark.asyncio
+async def test_batched_writer_high_water_mark():
+    writer = BatchedWriter(FakeWriter(), high_water_mark=10)  # type: ignore
+
+    await writer.write(b"12345")
+    assert writer.drains == 0
+    await writer.write(b"67890")
+    assert writer.drains == 1
+    assert writer.flushes == 1
+    assert writer.buffer_size == 0
+
+
+@pytest.mark.asyncio
+async def test_open_stdio_streams(monkeypatch: pytest.MonkeyPatch):
+    stdin_r, stdin_w = os.pipe()
+    stdout_r, stdout_w = os.pipe()
+    monkeypatch.setattr("sys.stdin", open(stdin_r, "rb", buffering=0))
+    monkeypatch.setattr("sys.stdout", open(stdout_w, "wb", buffering=0))
+
+    reader, writer = await open_stdio_streams()
+
+    os.write(stdin_w, b"ping\n")
+    assert await reader.readline() == b"ping\n"
+
+    writer.write(b"pong\n")
+    await writer.drain()
+    assert os.read(stdout_r, 5) == b"pong\n"
+
+    writer.close()
+    os.close(stdin_w)
+    os.close(stdout_r)
+
+
+def test_protocol_chunked_input(codec: JsonCodec):
+    protocol = JsonRPCProtocol(codec=codec)
+    data = (
+        b'{"jsonrpc": "2.0", "method": "query", "id": 1, "params": []}\r\n'
+        b"\r\n"
+        b'{"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 1}}\r\n'
+        b'{"jsonrpc": "2.0", "method": "foo", "params": {}}\r\n'
+        b"not json\r\n"
+    )
+
+    events = []
+    for i in range(0, len(data), 7):
+        events.extend(protocol.receive_data(data[i : i + 7]))
+
+    assert [type(event) for event in events] == [
+        RequestReceived,
+        CancelRequested,
+        NotificationReceived,
+        InvalidMessage,
+    ]
+    assert events[0].method == "query"
+    assert events[1].id == 1
+    assert events[3].data == b"not json\r"
+
+
+def test_protocol_matches_responses(codec: JsonCodec):
+    protocol = JsonRPCProtocol(codec=codec)
+    rid, msg = protocol.send_request("ShowMsg", ["title"])
+    assert codec.loads(msg)["id"] == rid
+    other, _ = protocol.send_request("ShowMainWindow")
+    assert protocol.pending == {rid: "ShowMsg", other: "ShowMainWindow"}
+
+    (event,) = protocol.receive_data(
+        codec.encode_message({"jsonrpc": "2.0", "id": rid, "result": None})
+    )
+    assert isinstance(event, ResultReceived)
+    assert event.method == "ShowMsg"
+
+    error = {"code": -32603, "message": "Internal error"}
+    (event,) = protocol.receive_data(
+        codec.encode_message({"jsonrpc": "2.0", "id": other, "error": error})
+    )
+    assert isinstance(event, ErrorReceived)
+    assert event.method == "ShowMainWindow"
+    assert event.error.code == -32603
+    assert event.error.data is None
+    assert protocol.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_client_over_memory_pipe():
+    plugin = Plugin()
+
+    @plugin.search()
+    async def handler(query):
+        return f"Hello {query.text}"
+
+    (plugin_reader, plugin_writer), (flow_reader, flow_writer) = create_memory_pipe()
+    listener = asyncio.create_task(
+        plugin.jsonrpc.start_listening(plugin_reader, plugin_writer)  # type: ignore
+    )
+
+    flow = JsonRPCProtocol()
+    query = {
+        "search": "world",
+        "rawQuery": "world",
+        "isReQuery": False,
+        "actionKeyword": "",
+    }
+    for rid in (1, 2):
+        flow_writer.write(
+            flow.codec.encode_message(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "query",
+                    "id": rid,
+                    "params": [query, {}],
+                }
+            )
+        )
+
+    events = []
+    async with asyncio.timeout(5):
+        while len(events) < 2:
+            events.extend(flow.receive_data(await flow_reader.read(2**16)))
+
+    assert sorted(event.id for event in events) == [1, 2]
+    for event in events:
+        assert event.result["result"][0]["title"] == "Hello world"
+
+    flow_writer.close()
+    await asyncio.wait_for(listener, 1)
+
+
+def test_protocol_max_message_size():
+    protocol = JsonRPCProtocol(max_message_size=100)
+    big = b'{"jsonrpc": "2.0", "method": "foo", "params": "' + b"x" * 200 + b'"}\r\n'
+    small = b'{"jsonrpc": "2.0", "method": "foo", "params": []}\r\n'
+
+    events = []
+    for i in range(0, len(big), 30):
+        events.extend(protocol.receive_data(big[i : i + 30]))
+    events.extend(protocol.receive_data(small))
+
+    assert [type(event) for event in events] == [InvalidMessage, NotificationReceived]
+    assert isinstance(events[0].error, JsonRPCMessageTooLarge)
+    assert protocol.framer.buffered == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_response_fails_request(client: JsonRPCClient):
+    task = asyncio.create_task(client.request("ShowMainWindow"))
+    await asyncio.sleep(0)
+    (rid,) = client.requests
+
+    await client.process_message({"jsonrpc": "2.0", "id": rid, "error": {}})
+    with pytest.raises(KeyError):
+        await asyncio.wait_for(task, 1)
+    assert client.pending_requests == 0
+    assert client.protocol.pending == {}
+
+
+class Unencodable(ExecuteResponse):
+    def to_dict(self) -> dict:
+        return {"value": object()}
+
+
+@pytest.mark.asyncio
+async def test_unencodable_response_sends_error(client: JsonRPCClient):
+    @client.plugin.event
+    async def on_foo():
+        return Unencodable()
+
+    await client.process_message(
+        {"jsonrpc": "2.0", "method": "foo", "id": 1, "params": []}
+    )
+    client.output.flush()
+    (msg,) = client.writer.written
+    data = client.codec.loads(msg)
+    assert data["id"] == 1
+    assert data["result"]["code"] == -32603
+
+
+@pytest.mark.asyncio
+async def test_open_stdio_streams_fallback(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    sentinel = (object(), object())
+
+    async def fake_aioconsole_streams():
+        return sentinel
+
+    monkeypatch.setattr(
+        "flogin.jsonrpc.transports._open_aioconsole_streams", fake_aioconsole_streams
+    )
+
+    monkeypatch.setattr("sys.platform", "win32")
+    assert await open_stdio_streams() is sentinel
+
+    monkeypatch.setattr("sys.platform", "linux")
+    stdin_r, stdin_w = os.pipe()
+    monkeypatch.setattr("sys.stdin", open(stdin_r, "rb", buffering=0))
+    # regular files can't be used with pipe transports, so connecting stdout fails after stdin is connected
+    monkeypatch.setattr("sys.stdout", open(tmp_path / "stdout", "wb"))
+    loop = asyncio.get_running_loop()
+    readers = len(loop._selector.get_map())  # type: ignore
+
+    assert await open_stdio_streams() is sentinel
+    await asyncio.sleep(0)
+    assert len(loop._selector.get_map()) == readers  # type: ignore
+    os.close(stdin_w)
+
+
+def test_framer_splits_chunks():
+    framer = LineFramer(max_size=None)
+    frames = []
+    for chunk in (b'{"a"', b": 1}\r", b"\n\r\n", b'{"b": 2}\n{"c"', b": 3}\n"):
+        frames.extend(framer.feed(chunk))
+
+    assert [bytes(frame) for frame in frames] == [
+        b'{"a": 1}\r',
+        b'{"b": 2}',
+        b'{"c": 3}',
+    ]
+    assert framer.buffered == 0
+
+
+@pytest.mark.parametrize("chunk_size", [2**16, 2**20 + 7])
+def test_protocol_multi_megabyte_messages(codec: JsonCodec, chunk_size: int):
+    protocol = JsonRPCProtocol(codec=codec, max_message_size=None)
+    plugins = [{"name": f"Plugin {i}", "description": "x" * 100} for i in range(30000)]
+    message = codec.encode_message(
+        {"jsonrpc": "2.0", "method": "foo", "params": plugins}
+    )
+    assert len(message) > 4 * 2**20
+    data = message * 3
+
+    events = []
+    for i in range(0, len(data), chunk_size):
+        events.extend(protocol.receive_data(data[i : i + chunk_size]))
+
+    assert len(events) == 3
+    for event in events:
+        assert isinstance(event, NotificationReceived)
+        assert event.params == plugins
+    assert protocol.framer.buffered == 0
+
+
+def test_registry_lru():
+    registry = ResultRegistry(retention="lru", max_size=2)
+    a, b, c = Result("a"), Result("b"), Result("c")
+    registry.update([a, b])
+    assert registry.get(a.slug) is a
+    registry[c.slug] = c
+
+    assert b.slug not in registry
+    assert len(registry) == 2
+    assert registry.stats().evicted == 1
+
+
+def test_registry_weak():
+    registry = ResultRegistry(retention="weak")
+    kept = Result("kept")
+    registry.add(kept)
+    registry.add(Result("dropped"))
+
+    assert len(registry) == 1
+    assert registry[kept.slug] is kept
+
+
+def test_slug_strategies():
+    assert Result("a").slug != Result("a").slug
+
+    class ContentResult(Result):
+        slug_strategy = content_slug
+
+    async def callback():
+        pass
+
+    assert ContentResult("a", "b").slug == ContentResult("a", "b").slug
+    assert ContentResult("a", "b").slug != ContentResult("a", "c").slug
+    assert ContentResult("a").slug != Result("a").slug
+
+    first = ContentResult.create_with_partial(functools.partial(callback), title="a")
+    second = ContentResult.create_with_partial(functools.partial(callback), title="a")
+    other = ContentResult.create_with_partial(callback, title="a")
+    assert first.slug == second.slug != other.slug
+
+    registry = ResultRegistry()
+    registry.new_generation()
+    registry.update([first, second])
+    registry.new_generation()
+    registry.add(ContentResult("a", "b"))
+    registry.add(ContentResult("a", "b"))
+    assert len(registry) == 2
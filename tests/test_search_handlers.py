@@ -1,7 +1,22 @@
+import asyncio
+import os
+import re
+import time
+
 import pytest
 
-from flogin import Plugin, Query, Result, SearchHandler
+from flogin import (
+    KeywordCondition,
+    PlainTextCondition,
+    Plugin,
+    Query,
+    RegexCondition,
+    Result,
+    SearchHandler,
+)
+from flogin.routing import SearchHandlerRouter
 from flogin.testing import PluginTester
+from flogin.utils import stale_while_revalidate
 
 
 @pytest.fixture
@@ -72,15 +87,466 @@ async def test_handler_result(tester: PluginTester, handler: SearchHandler):
     result = response.results[0]
     assert result.title == "Title"
 
+
 @pytest.mark.asyncio
 async def test_handler_error(plugin: Plugin, tester: PluginTester):
     @plugin.search()
     async def handler(query: Query):
         raise TypeError("Boo")
-    
+
     @handler.error
     async def error_handler(query: Query, error: Exception):
         assert isinstance(error, TypeError)
         assert str(error) == "Boo"
-    
-    await tester.test_query("bar")
\ No newline at end of file
+
+    await tester.test_query("bar")
+
+
+@pytest.mark.asyncio
+async def test_supersede_queries(metadata):
+    plugin = Plugin(supersede_queries=True)
+    tester = PluginTester(plugin, metadata=metadata)
+    finished: list[str] = []
+    closed: list[str] = []
+
+    @plugin.search()
+    async def handler(query: Query):
+        try:
+            yield query.text
+            if query.text == "slow":
+                await asyncio.sleep(10)
+            finished.append(query.text)
+        finally:
+            closed.append(query.text)
+
+    slow = asyncio.create_task(tester.test_query("slow"))
+    await asyncio.sleep(0.01)
+    fast = await tester.test_query("fast")
+
+    assert closed == ["slow", "fast"]
+    assert (await asyncio.wait_for(slow, 1)).results == []
+    assert fast.results[0].title == "fast"
+    assert finished == ["fast"]
+
+
+@pytest.mark.asyncio
+async def test_query_debounce(metadata):
+    plugin = Plugin(query_debounce=0.05)
+    tester = PluginTester(plugin, metadata=metadata)
+    ran: list[str] = []
+
+    @plugin.search()
+    async def handler(query: Query):
+        ran.append(query.text)
+        return query.text
+
+    responses = await asyncio.gather(
+        *(tester.test_query(text) for text in ("f", "fo", "foo"))
+    )
+
+    assert ran == ["foo"]
+    assert [len(r.results) for r in responses] == [0, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_results_are_scoped_to_generations(metadata):
+    plugin = Plugin(max_result_generations=2)
+    tester = PluginTester(plugin, metadata=metadata)
+
+    @plugin.search()
+    async def handler(query: Query):
+        return query.text
+
+    first = (await tester.test_query("first")).results[0]
+    second = (await tester.test_query("second")).results[0]
+    assert plugin.result_registry.get(first.slug) is first
+
+    third = (await tester.test_query("third")).results[0]
+    assert first.slug not in plugin.result_registry
+    assert plugin.result_registry.get(second.slug) is second
+    assert plugin.result_registry.get(third.slug) is third
+
+    stats = plugin.result_registry.stats()
+    assert stats.size == 2
+    assert stats.evicted == 1
+
+
+def _make_query(text: str, keyword: str = "*") -> Query:
+    return Query(
+        {
+            "search": text,
+            "rawQuery": f"{keyword} {text}",
+            "isReQuery": False,
+            "actionKeyword": keyword,
+        },
+        None,
+    )
+
+
+def test_router_keeps_registration_order():
+    router = SearchHandlerRouter()
+    handlers = [
+        SearchHandler(KeywordCondition(allowed_keywords=["kw"])),
+        SearchHandler(lambda q: q.text.startswith("a")),
+        SearchHandler(PlainTextCondition("abc")),
+        SearchHandler(KeywordCondition(disallowed_keywords=["other"])),
+        SearchHandler(PlainTextCondition("abc")),
+        SearchHandler(PlainTextCondition("xyz")),
+    ]
+    for handler in handlers:
+        router.add(handler)
+
+    assert list(router.route(_make_query("abc", "kw"))) == handlers[:5]
+    assert list(router.route(_make_query("abc", "other"))) == [
+        handlers[1],
+        handlers[2],
+        handlers[4],
+    ]
+    assert list(router.route(_make_query("xyz", "other"))) == [handlers[5]]
+
+
+@pytest.mark.asyncio
+async def test_router_with_many_handlers(plugin: Plugin, tester: PluginTester):
+    calls = 0
+
+    def counting_condition(query: Query) -> bool:
+        nonlocal calls
+        calls += 1
+        return False
+
+    for i in range(1000):
+        plugin.register_search_handler(
+            SearchHandler(
+                counting_condition if i % 100 == 0 else PlainTextCondition(str(i))
+            )
+        )
+
+    @plugin.search(text="999")
+    async def handler(query: Query):
+        return "wrong handler"
+
+    handler = plugin._search_handlers[999]
+
+    async def callback(query: Query):
+        return "right handler"
+
+    handler.callback = callback  # type: ignore
+
+    response = await tester.test_query("999")
+    assert response.results[0].title == "right handler"
+    assert calls == 10
+
+
+def test_router_combines_regex_conditions():
+    router = SearchHandlerRouter()
+    handlers = [
+        SearchHandler(RegexCondition(re.compile(r"add (\d+)"))),
+        SearchHandler(RegexCondition(re.compile(r"(?P<name>\w+) (?P=name)"))),
+        SearchHandler(RegexCondition(re.compile(r"ADD (\d+)", re.IGNORECASE))),
+        SearchHandler(RegexCondition(re.compile(r"(?i)add"))),
+    ]
+    for handler in handlers:
+        router.add(handler)
+
+    assert router.combined_pattern is not None
+    assert router.combined_pattern.groupindex.keys() == {"_r0", "_r2"}
+
+    query = _make_query("add 12")
+    assert list(router.route(query)) == [handlers[0], handlers[2], handlers[3]]
+
+    query = _make_query("Add 5")
+    assert next(router.route(query)) is handlers[2]
+    assert query.condition_data.re is handlers[2].condition.pattern  # type: ignore
+    assert query.condition_data.group(1) == "5"  # type: ignore
+
+    query = _make_query("hi hi")
+    assert list(router.route(query)) == [handlers[1]]
+    assert query.condition_data.group("name") == "hi"  # type: ignore
+
+    added = SearchHandler(RegexCondition(re.compile(r"sub (\d+)")))
+    router.add(added)
+    assert router.combined_pattern.groupindex.keys() == {"_r0", "_r2", "_r4"}
+    assert list(router.route(_make_query("sub 1"))) == [added]
+
+
+class RecordingAPI:
+    def __init__(self) -> None:
+        self.updates: list[tuple[str, list[str]]] = []
+
+    async def update_results(self, raw_query: str, results: list[Result]) -> None:
+        self.updates.append((raw_query, [result.title for result in results]))
+
+
+@pytest.mark.asyncio
+async def test_stream_results(metadata):
+    plugin = Plugin(
+        stream_results=True, stream_time_slice=0.05, stream_flush_interval=0.05
+    )
+    api = RecordingAPI()
+    tester = PluginTester(plugin, metadata=metadata, flow_api_client=api)
+
+    @plugin.search()
+    async def handler(query: Query):
+        yield "first"
+        await asyncio.sleep(0.1)
+        yield "second"
+        yield "third"
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    response = await tester.test_query("text")
+    assert loop.time() - start < 0.1
+    assert [result.title for result in response.results] == ["first"]
+
+    await asyncio.sleep(0.2)
+    assert api.updates == [("* text", ["first", "second", "third"])]
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_for_newer_queries(metadata):
+    plugin = Plugin(stream_results=True, stream_batch_size=1)
+    api = RecordingAPI()
+    tester = PluginTester(plugin, metadata=metadata, flow_api_client=api)
+    closed = asyncio.Event()
+
+    @plugin.search(text="slow")
+    async def slow(query: Query):
+        try:
+            yield "first"
+            await asyncio.sleep(0.1)
+            yield "second"
+        finally:
+            closed.set()
+
+    @plugin.search(text="fast")
+    async def fast(query: Query):
+        return "fast"
+
+    response = await tester.test_query("slow")
+    assert [result.title for result in response.results] == ["first"]
+    await tester.test_query("fast")
+
+    await asyncio.wait_for(closed.wait(), 1)
+    await asyncio.sleep(0.2)
+    assert api.updates == []
+
+
+@pytest.mark.asyncio
+async def test_fan_out_search_handlers(metadata):
+    plugin = Plugin(fan_out_search_handlers=True, search_handler_timeout=0.2)
+    tester = PluginTester(plugin, metadata=metadata)
+
+    @plugin.search(pattern=re.compile(r"find (\w+)"))
+    async def local(query: Query[re.Match]):
+        await asyncio.sleep(0.1)
+        return Result(f"local {query.condition_data.group(1)}", score=1)  # type: ignore
+
+    @plugin.search()
+    async def remote(query: Query):
+        await asyncio.sleep(0.1)
+        yield Result(f"remote {query.condition_data}", score=5)
+
+    @plugin.search()
+    async def slow(query: Query):
+        await asyncio.sleep(1)
+        return Result("slow")
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    response = await tester.test_query("find it")
+    assert loop.time() - start < 0.5
+    assert [result.title for result in response.results] == [
+        "remote None",
+        "local it",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fan_out_query_budget(metadata):
+    plugin = Plugin(fan_out_search_handlers=True, query_budget=0.1)
+    tester = PluginTester(plugin, metadata=metadata)
+    cancelled = asyncio.Event()
+
+    @plugin.search()
+    async def fast(query: Query):
+        return "fast"
+
+    @plugin.search()
+    async def slow(query: Query):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "slow"
+
+    response = await tester.test_query("text")
+    assert [result.title for result in response.results] == ["fast"]
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_deadline_sends_partial_results(plugin: Plugin, tester: PluginTester):
+    closed = False
+    exceeded = []
+
+    @plugin.search(text="gen", deadline=0.05)
+    async def gen_handler(query: Query):
+        nonlocal closed
+        try:
+            yield "first"
+            yield "second"
+            await asyncio.sleep(1)
+            yield "third"
+        finally:
+            closed = True
+
+    @gen_handler.deadline_exceeded
+    async def on_deadline_exceeded(query: Query, results: list[Result]):
+        exceeded.append((query.text, [result.title for result in results]))
+
+    @plugin.search(text="coro", deadline=0.05)
+    async def coro_handler(query: Query):
+        await asyncio.sleep(1)
+        return "never"
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    response = await tester.test_query("gen")
+    assert loop.time() - start < 0.5
+    assert [result.title for result in response.results] == ["first", "second"]
+    assert closed
+    assert exceeded == [("gen", ["first", "second"])]
+
+    response = await tester.test_query("coro")
+    assert response.results == []
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate(metadata):
+    plugin = Plugin()
+    api = RecordingAPI()
+    tester = PluginTester(plugin, metadata=metadata, flow_api_client=api)
+    version = 0
+
+    @plugin.search()
+    @stale_while_revalidate
+    async def handler(query: Query):
+        nonlocal version
+        version += 1
+        await asyncio.sleep(0.05)
+        return f"{query.text} v{version}"
+
+    response = await tester.test_query("a")
+    assert [result.title for result in response.results] == ["a v1"]
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    response = await tester.test_query("a")
+    assert loop.time() - start < 0.05
+    assert [result.title for result in response.results] == ["a v1"]
+
+    await asyncio.sleep(0.1)
+    assert api.updates == [("* a", ["a v2"])]
+
+    response = await tester.test_query("a")
+    assert [result.title for result in response.results] == ["a v2"]
+    await tester.test_query("b")
+    await asyncio.sleep(0.1)
+    assert api.updates == [("* a", ["a v2"])]
+
+
+@pytest.mark.asyncio
+async def test_incremental_search_handler(plugin: Plugin, tester: PluginTester):
+    corpus = ["foo", "foobar", "food", "bar"]
+    calls: list[tuple[str, list[str] | None]] = []
+
+    @plugin.search(incremental=True)
+    async def handler(query: Query, candidates: list[str] | None):
+        calls.append((query.text, candidates))
+        return [item for item in (candidates or corpus) if query.text in item]
+
+    assert handler.name == "handler"
+
+    async def titles(text: str, keyword: str = "*") -> list[str]:
+        response = await tester.test_query(text, keyword=keyword)
+        return [result.title for result in response.results]  # type: ignore
+
+    assert await titles("foo") == ["foo", "foobar", "food"]
+    assert await titles("foob") == ["foobar"]
+    assert await titles("foo") == ["foo", "foobar", "food"]
+    assert await titles("fo", keyword="kw") == ["foo", "foobar", "food"]
+    assert await titles("food") == ["food"]
+
+    assert calls == [
+        ("foo", None),
+        ("foob", ["foo", "foobar", "food"]),
+        ("foo", None),
+        ("fo", None),
+        ("food", ["foo", "foobar", "food"]),
+    ]
+
+    handler.invalidate()  # type: ignore
+    assert await titles("foods") == []
+    assert calls[-1] == ("foods", None)
+
+
+def blocking_handler(query: Query):
+    time.sleep(0.05)
+    yield f"{query.text} from {os.getpid()}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_executor_search_handler(metadata, executor: str):
+    plugin = Plugin(max_thread_workers=2, max_process_workers=1)
+    tester = PluginTester(plugin, metadata=metadata)
+    plugin.search(executor=executor)(blocking_handler)  # type: ignore
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        response = await tester.test_query("text")
+    finally:
+        ticker.cancel()
+        plugin._shutdown_executors()
+
+    pid = os.getpid()
+    title = response.results[0].title
+    assert title.startswith("text from ")
+    assert (title == f"text from {pid}") is (executor == "thread")
+    assert ticks > 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_executor_search_handler_never_runs(metadata):
+    plugin = Plugin(max_thread_workers=1, supersede_queries=True)
+    tester = PluginTester(plugin, metadata=metadata)
+    ran: list[str] = []
+
+    @plugin.search(executor="thread")
+    def handler(query: Query):
+        time.sleep(0.1)
+        ran.append(query.text)
+        return query.text
+
+    try:
+        first = asyncio.create_task(tester.test_query("first"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(tester.test_query("second"))
+        await asyncio.sleep(0.01)
+        third = asyncio.create_task(tester.test_query("third"))
+
+        assert (await first).results == []
+        assert (await second).results == []
+        assert [result.title for result in (await third).results] == ["third"]
+        assert ran == ["first", "third"]
+    finally:
+        plugin._shutdown_executors()